@@ -1,7 +1,8 @@
+import asyncio
 from logging.config import fileConfig
 
-from sqlalchemy import engine_from_config
-from sqlalchemy import pool
+from sqlalchemy import pool, text
+from sqlalchemy.ext.asyncio import async_engine_from_config
 
 from alembic import context
 from src.core.config import settings
@@ -59,26 +60,52 @@ def run_migrations_offline():
         context.run_migrations()
 
 
-def run_migrations_online():
-    """Run migrations in 'online' mode.
+# Ключ advisory lock, чтобы одновременно запущенные миграции шли по очереди
+MIGRATION_LOCK_ID = 7232170901
 
-    In this scenario we need to create an Engine
-    and associate a connection with the context.
 
-    """
-    connectable = engine_from_config(
+def do_run_migrations(connection):
+    context.configure(
+        connection=connection, target_metadata=target_metadata
+    )
+
+    # Блокировка сессионная: миграции с CREATE INDEX CONCURRENTLY
+    # выходят из транзакции через autocommit_block
+    lock_params = {'lock_id': MIGRATION_LOCK_ID}
+    connection.execute(text('SELECT pg_advisory_lock(:lock_id)'), lock_params)
+    connection.commit()
+    try:
+        with context.begin_transaction():
+            context.run_migrations()
+    finally:
+        connection.execute(
+            text('SELECT pg_advisory_unlock(:lock_id)'), lock_params
+        )
+        connection.commit()
+
+
+async def run_async_migrations():
+    """Run migrations through the async driver used by the service."""
+    connectable = async_engine_from_config(
         config.get_section(config.config_ini_section),
         prefix="sqlalchemy.",
         poolclass=pool.NullPool,
     )
 
-    with connectable.connect() as connection:
-        context.configure(
-            connection=connection, target_metadata=target_metadata
-        )
+    async with connectable.connect() as connection:
+        await connection.run_sync(do_run_migrations)
 
-        with context.begin_transaction():
-            context.run_migrations()
+    await connectable.dispose()
+
+
+def run_migrations_online():
+    """Run migrations in 'online' mode.
+
+    In this scenario we need to create an Engine
+    and associate a connection with the context.
+
+    """
+    asyncio.run(run_async_migrations())
 
 
 if context.is_offline_mode():
@@ -0,0 +1,78 @@
+"""hot path indexes
+
+Revision ID: 2
+Revises: 1
+Create Date: 2023-07-10 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2'
+down_revision = '1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # дубликаты ролей мешают уникальному ограничению, оставляем по одной
+    op.execute(
+        'DELETE FROM usersroles a USING usersroles b '
+        'WHERE a.user_id = b.user_id AND a.role_id = b.role_id AND a.id > b.id'
+    )
+    # CONCURRENTLY нельзя выполнять в транзакции, зато таблица не блокируется
+    with op.get_context().autocommit_block():
+        # токен длинный, для поиска по равенству hash-индекс компактнее btree
+        op.create_index(
+            'ix_refresh_tokens_user_token',
+            'refresh_tokens',
+            ['user_token'],
+            postgresql_using='hash',
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_refresh_tokens_active_user_agent',
+            'refresh_tokens',
+            ['user_id', 'user_agent'],
+            postgresql_where=sa.text('is_active'),
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_account_history_user_created',
+            'account_history',
+            ['user_id', sa.text('created_at DESC')],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'uq_usersroles_user_role',
+            'usersroles',
+            ['user_id', 'role_id'],
+            unique=True,
+            postgresql_concurrently=True,
+        )
+    op.execute(
+        'ALTER TABLE usersroles ADD CONSTRAINT uq_usersroles_user_role '
+        'UNIQUE USING INDEX uq_usersroles_user_role'
+    )
+
+
+def downgrade():
+    op.drop_constraint('uq_usersroles_user_role', 'usersroles', type_='unique')
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_account_history_user_created',
+            table_name='account_history',
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            'ix_refresh_tokens_active_user_agent',
+            table_name='refresh_tokens',
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            'ix_refresh_tokens_user_token',
+            table_name='refresh_tokens',
+            postgresql_concurrently=True,
+        )
@@ -0,0 +1,104 @@
+"""partition account_history by month
+
+Revision ID: 3
+Revises: 2
+Create Date: 2023-07-20 12:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '3'
+down_revision = '2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute('ALTER TABLE account_history RENAME TO account_history_old')
+    op.execute(
+        'ALTER INDEX ix_account_history_user_created '
+        'RENAME TO ix_account_history_old_user_created'
+    )
+    op.execute(
+        'ALTER TABLE account_history_old '
+        'RENAME CONSTRAINT account_history_pkey TO account_history_old_pkey'
+    )
+    # в ключ секционированной таблицы обязан входить created_at
+    op.execute("""
+        CREATE TABLE account_history (
+            id UUID NOT NULL,
+            user_id UUID REFERENCES users (id) ON DELETE CASCADE,
+            user_agent VARCHAR(255) NOT NULL DEFAULT 'default UA',
+            created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            updated_at TIMESTAMP WITHOUT TIME ZONE,
+            PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+    """)
+    op.execute(
+        'CREATE INDEX ix_account_history_user_created '
+        'ON account_history (user_id, created_at DESC)'
+    )
+    # секции с месяца самой старой записи и на два месяца вперёд
+    op.execute("""
+        DO $$
+        DECLARE
+            month_start DATE;
+            last_month DATE := date_trunc('month', now()) + INTERVAL '2 months';
+        BEGIN
+            SELECT date_trunc('month', COALESCE(MIN(COALESCE(created_at, updated_at)), now()))
+            INTO month_start FROM account_history_old;
+            WHILE month_start <= last_month LOOP
+                EXECUTE format(
+                    'CREATE TABLE IF NOT EXISTS %I PARTITION OF account_history '
+                    'FOR VALUES FROM (%L) TO (%L)',
+                    'account_history_y' || to_char(month_start, 'YYYY"m"MM'),
+                    month_start,
+                    month_start + INTERVAL '1 month'
+                );
+                month_start := month_start + INTERVAL '1 month';
+            END LOOP;
+        END $$
+    """)
+    # копирование одним запросом в транзакции миграции: обе таблицы
+    # заблокированы до её конца, запускать в окно обслуживания
+    op.execute("""
+        INSERT INTO account_history (id, user_id, user_agent, created_at, updated_at)
+        SELECT id, user_id, user_agent,
+               COALESCE(created_at, updated_at, now()), updated_at
+        FROM account_history_old
+    """)
+    op.execute('DROP TABLE account_history_old')
+
+
+def downgrade():
+    op.execute('ALTER TABLE account_history RENAME TO account_history_partitioned')
+    op.execute(
+        'ALTER INDEX ix_account_history_user_created '
+        'RENAME TO ix_account_history_partitioned_user_created'
+    )
+    op.execute(
+        'ALTER TABLE account_history_partitioned RENAME CONSTRAINT '
+        'account_history_pkey TO account_history_partitioned_pkey'
+    )
+    op.execute("""
+        CREATE TABLE account_history (
+            id UUID NOT NULL PRIMARY KEY,
+            user_id UUID REFERENCES users (id) ON DELETE CASCADE,
+            user_agent VARCHAR(255) NOT NULL DEFAULT 'default UA',
+            created_at TIMESTAMP WITHOUT TIME ZONE,
+            updated_at TIMESTAMP WITHOUT TIME ZONE,
+            UNIQUE (id)
+        )
+    """)
+    op.execute(
+        'CREATE INDEX ix_account_history_user_created '
+        'ON account_history (user_id, created_at DESC)'
+    )
+    op.execute("""
+        INSERT INTO account_history (id, user_id, user_agent, created_at, updated_at)
+        SELECT id, user_id, user_agent, created_at, updated_at
+        FROM account_history_partitioned
+    """)
+    op.execute('DROP TABLE account_history_partitioned CASCADE')
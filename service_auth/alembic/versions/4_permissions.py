@@ -0,0 +1,55 @@
+"""permissions
+
+Revision ID: 4
+Revises: 3
+Create Date: 2023-07-28 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '4'
+down_revision = '3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'permissions',
+        sa.Column('name', sa.String(length=50), nullable=False),
+        sa.Column('description', sa.String(length=255), nullable=False),
+        sa.Column('bit', sa.Integer(), nullable=False),
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('id'),
+        sa.UniqueConstraint('name'),
+        sa.UniqueConstraint('bit')
+    )
+    op.create_table(
+        'rolespermissions',
+        sa.Column('role_id', postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column('permission_id', postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['role_id'], ['roles.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(
+            ['permission_id'], ['permissions.id'], ondelete='CASCADE'
+        ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('id'),
+        sa.UniqueConstraint(
+            'role_id', 'permission_id', name='uq_rolespermissions_role_permission'
+        )
+    )
+
+
+def downgrade():
+    op.drop_table('rolespermissions')
+    op.drop_table('permissions')
@@ -0,0 +1,29 @@
+"""account_history default partition
+
+Revision ID: 5
+Revises: 4
+Create Date: 2023-08-02 12:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '5'
+down_revision = '4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # принимает записи, для месяца которых ещё нет секции:
+    # иначе вставка падает, пока не запущен src.maintenance
+    op.execute(
+        'CREATE TABLE IF NOT EXISTS account_history_default '
+        'PARTITION OF account_history DEFAULT'
+    )
+
+
+def downgrade():
+    op.execute('ALTER TABLE account_history DETACH PARTITION account_history_default')
+    op.execute('DROP TABLE account_history_default')
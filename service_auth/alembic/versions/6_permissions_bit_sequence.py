@@ -0,0 +1,40 @@
+"""permissions bit sequence
+
+Revision ID: 6
+Revises: 5
+Create Date: 2023-08-02 13:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '6'
+down_revision = '5'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # бит права выдаёт база: max(bit) + 1 в приложении давал одинаковые
+    # биты двум одновременным созданиям
+    op.execute(
+        'CREATE SEQUENCE permissions_bit_seq MINVALUE 0 START 0 '
+        'OWNED BY permissions.bit'
+    )
+    op.execute("""
+        SELECT setval(
+            'permissions_bit_seq',
+            COALESCE((SELECT MAX(bit) + 1 FROM permissions), 0),
+            false
+        )
+    """)
+    op.execute(
+        "ALTER TABLE permissions ALTER COLUMN bit "
+        "SET DEFAULT nextval('permissions_bit_seq')"
+    )
+
+
+def downgrade():
+    op.execute('ALTER TABLE permissions ALTER COLUMN bit DROP DEFAULT')
+    op.execute('DROP SEQUENCE permissions_bit_seq')
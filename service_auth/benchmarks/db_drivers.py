@@ -0,0 +1,171 @@
+"""Сравнение пропускной способности API на асинхронных драйверах Postgres.
+
+Для каждого драйвера приложение запускается в отдельном процессе с
+DB_DRIVER=<драйвер>, и запросы GET /api/v1/users/account-history идут
+через весь стек: middleware, зависимости, сервис и DbService. Запросы
+передаются приложению напрямую по ASGI, без сети и HTTP-клиента.
+
+Нужны запущенные база и Redis из .env, миграции применены.
+Запуск из папки service_auth:
+    python -m benchmarks.db_drivers --seconds 10 --concurrency 50
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from typing import Optional, Tuple
+from urllib.parse import urlencode
+
+DRIVERS = ('asyncpg', 'psycopg')
+EMAIL = 'bench@example.com'
+PASSWORD = '123QWEbench'
+
+
+async def call(
+    app,
+    method: str,
+    path: str,
+    query: Optional[dict] = None,
+    headers: Optional[dict] = None,
+    body: Optional[dict] = None,
+) -> Tuple[int, bytes]:
+    raw_body = json.dumps(body).encode('utf-8') if body is not None else b''
+    raw_headers = [(b'user-agent', b'benchmark')]
+    if body is not None:
+        raw_headers.append((b'content-type', b'application/json'))
+    for name, value in (headers or {}).items():
+        raw_headers.append((name.lower().encode('latin-1'), value.encode('latin-1')))
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': method,
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode('latin-1'),
+        'query_string': urlencode(query or {}).encode('latin-1'),
+        'root_path': '',
+        'headers': raw_headers,
+        'client': ('127.0.0.1', 50000),
+        'server': ('benchmark', 80),
+    }
+    sent = False
+    status = 0
+    chunks = []
+
+    async def receive() -> dict:
+        nonlocal sent
+        if sent:
+            await asyncio.Event().wait()
+        sent = True
+        return {'type': 'http.request', 'body': raw_body, 'more_body': False}
+
+    async def send(message) -> None:
+        nonlocal status
+        if message['type'] == 'http.response.start':
+            status = message['status']
+        elif message['type'] == 'http.response.body':
+            chunks.append(message.get('body', b''))
+
+    await app(scope, receive, send)
+    return status, b''.join(chunks)
+
+
+async def run_driver(seconds: float, concurrency: int) -> dict:
+    # импорт здесь: настройки читают DB_DRIVER при загрузке модуля
+    from src.main import app
+
+    async with app.router.lifespan_context(app):
+        await call(app, 'POST', '/api/v1/auth/register', body={
+            'first_name': 'Bench', 'last_name': 'Bench',
+            'email': EMAIL, 'password': PASSWORD,
+        })
+        status, body = await call(app, 'POST', '/api/v1/auth/login', body={
+            'email': EMAIL, 'password': PASSWORD,
+        })
+        if status >= 300:
+            raise RuntimeError(f'Login failed: {status} {body!r}')
+        headers = {'Authorization': f'Bearer {json.loads(body)["access_token"]}'}
+
+        latencies = []
+        errors = 0
+        deadline = time.perf_counter() + seconds
+
+        async def worker() -> None:
+            nonlocal errors
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                status, _ = await call(
+                    app, 'GET', '/api/v1/users/account-history',
+                    query={'page_size': 10}, headers=headers
+                )
+                latencies.append(time.perf_counter() - start)
+                if status >= 300:
+                    errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        'rps': len(latencies) / elapsed,
+        'p50': statistics.median(latencies) * 1000,
+        'p99': latencies[int(len(latencies) * 0.99) - 1] * 1000,
+        'errors': errors,
+    }
+
+
+def bench(driver: str, seconds: float, concurrency: int) -> dict:
+    # логи и access log не должны попадать в замер
+    env = {
+        **os.environ,
+        'DB_DRIVER': driver,
+        'LOG_LEVEL': 'WARNING',
+        'ACCESS_LOG_SAMPLE_RATE': '0',
+        'ACCESS_LOG_SLOW_MS': '1000000',
+    }
+    process = subprocess.run(
+        [
+            sys.executable, '-m', 'benchmarks.db_drivers',
+            '--driver', driver,
+            '--seconds', str(seconds),
+            '--concurrency', str(concurrency),
+        ],
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if process.returncode != 0:
+        raise RuntimeError(f'{driver} benchmark failed:\n{process.stderr}')
+    return json.loads(process.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--seconds', type=float, default=5.0)
+    parser.add_argument('--concurrency', type=int, default=20)
+    parser.add_argument('--driver', choices=DRIVERS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.driver:
+        result = asyncio.run(run_driver(args.seconds, args.concurrency))
+        print(json.dumps(result))
+        return
+
+    print(f'{"driver":<10} {"requests/sec":>13} {"p50 ms":>8} {"p99 ms":>8} {"errors":>7}')
+    for driver in DRIVERS:
+        result = bench(driver, args.seconds, args.concurrency)
+        print(
+            f'{driver:<10} {result["rps"]:>13.1f} '
+            f'{result["p50"]:>8.2f} {result["p99"]:>8.2f} {result["errors"]:>7}'
+        )
+
+
+if __name__ == '__main__':
+    main()
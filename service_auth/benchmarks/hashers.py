@@ -0,0 +1,58 @@
+"""Замер скорости алгоритмов хэширования паролей на текущей машине.
+
+Запуск из папки service_auth:
+    python -m benchmarks.hashers --seconds 2 --cost pbkdf2=260000,600000
+"""
+import argparse
+import time
+
+from src.utils.hashers import available_hashers, make_hasher
+
+DEFAULT_COSTS = {
+    'pbkdf2': [100000, 260000, 600000],
+    'bcrypt': [10, 12, 14],
+    'argon2': [2, 3, 4],
+    'scrypt': [14, 16],
+}
+PASSWORD = 'Hello' + 'user@example.com' + '123QWEstring'
+
+
+def bench(name: str, cost: int, seconds: float) -> float:
+    hasher = make_hasher(name, cost=cost)
+    pwhash = hasher.hash(PASSWORD)
+    done = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        hasher.verify(pwhash, PASSWORD)
+        done += 1
+    return done / (time.perf_counter() - start)
+
+
+def parse_costs(value: str) -> dict:
+    costs = {}
+    for item in value.split(';'):
+        name, _, numbers = item.partition('=')
+        costs[name.strip()] = [int(number) for number in numbers.split(',')]
+    return costs
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--seconds', type=float, default=1.0)
+    parser.add_argument(
+        '--cost',
+        type=parse_costs,
+        default=DEFAULT_COSTS,
+        help='например "pbkdf2=260000,600000;bcrypt=12"',
+    )
+    args = parser.parse_args()
+
+    print(f'{"hasher":<8} {"cost":>8} {"hashes/sec":>12} {"ms/hash":>10}')
+    for name in available_hashers():
+        for cost in args.cost.get(name, []):
+            rate = bench(name, cost, args.seconds)
+            print(f'{name:<8} {cost:>8} {rate:>12.1f} {1000 / rate:>10.2f}')
+
+
+if __name__ == '__main__':
+    main()
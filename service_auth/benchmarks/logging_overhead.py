@@ -0,0 +1,106 @@
+"""Замер стоимости логирования на один запрос в потоке обработчика.
+
+Сравнивает прежнюю схему (f-строки и синхронный StreamHandler)
+с текущей (%-форматирование и вывод через QueueListener).
+
+Запуск из папки service_auth:
+    python -m benchmarks.logging_overhead --requests 20000
+"""
+import argparse
+import logging
+import os
+import queue
+import time
+
+from logging.handlers import QueueListener
+
+from src.core.logger import LOG_FORMAT, LocalQueueHandler
+
+# Примерно столько записей делает вход пользователя
+PARAMS = {
+    'user_agent': 'Mozilla/5.0 (X11; Linux x86_64) Firefox/115.0',
+    'email': 'user@example.com',
+    'set_cookie': False,
+    'subject': '0b5cbe5e-5b7a-4e4d-9d7b-a3c34f0e2f61',
+    'user_claims': {'email': 'user@example.com', 'roles': ['user', 'admin']},
+}
+
+
+def request_eager(logger: logging.Logger) -> None:
+    p = PARAMS
+    logger.info(f"""Start User login. Params:
+            user_agent - {p['user_agent']},
+            email - {p['email']},
+            set_cookie - {p['set_cookie']}
+            """)
+    logger.info(f"""Start to check user exist.
+        Params: by - email, data - {p['email']}""")
+    logger.info(f"""Start to create tokens. Params:
+        subject - {p['subject']},
+        is_ex - True,
+        user_claims - {p['user_claims']}
+        """)
+    logger.info("Finish to create tokens")
+    logger.info("Finish User login")
+
+
+def request_lazy(logger: logging.Logger) -> None:
+    p = PARAMS
+    logger.info(
+        "Start User login. Params: user_agent - %s, email - %s, set_cookie - %s",
+        p['user_agent'], p['email'], p['set_cookie']
+    )
+    logger.info("Start to check user exist. Params: by - %s, data - %s", 'email', p['email'])
+    logger.info(
+        "Start to create tokens. Params: subject - %s, is_ex - %s, user_claims - %s",
+        p['subject'], True, p['user_claims']
+    )
+    logger.info("Finish to create tokens")
+    logger.info("Finish User login")
+
+
+def make_logger(name: str, level: int, handler: logging.Handler) -> logging.Logger:
+    logger = logging.getLogger(f'benchmark.{name}')
+    logger.handlers = [handler]
+    logger.setLevel(level)
+    logger.propagate = False
+    return logger
+
+
+def bench(request, logger: logging.Logger, requests: int) -> float:
+    start = time.perf_counter()
+    for _ in range(requests):
+        request(logger)
+    return (time.perf_counter() - start) / requests * 1_000_000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=20000)
+    args = parser.parse_args()
+
+    with open(os.devnull, 'w') as devnull:
+        stream = logging.StreamHandler(devnull)
+        stream.setFormatter(logging.Formatter(LOG_FORMAT))
+
+        log_queue = queue.SimpleQueue()
+        listener = QueueListener(log_queue, stream)
+        listener.start()
+
+        print(f'{"scheme":<28} {"level":<8} {"us/request":>12}')
+        for level in (logging.INFO, logging.WARNING):
+            level_name = logging.getLevelName(level)
+            before = make_logger('before', level, stream)
+            after = make_logger('after', level, LocalQueueHandler(log_queue))
+            rows = [
+                ('f-string + StreamHandler', request_eager, before),
+                ('%-format + QueueHandler', request_lazy, after),
+            ]
+            for title, request, logger in rows:
+                cost = bench(request, logger, args.requests)
+                print(f'{title:<28} {level_name:<8} {cost:>12.2f}')
+        listener.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -32,6 +32,11 @@ async def create_user(
             status_code=HTTPStatus.CONFLICT,
             detail='User already registered'
         )
+    if result == HTTPStatus.SERVICE_UNAVAILABLE:
+        raise HTTPException(
+            status_code=HTTPStatus.SERVICE_UNAVAILABLE,
+            detail='Service is busy, try again later'
+        )
     if not result:
         raise HTTPException(
             status_code=HTTPStatus.BAD_GATEWAY,
@@ -72,6 +77,11 @@ async def login(
             status_code=HTTPStatus.UNAUTHORIZED,
             detail='Invalid password'
         )
+    if result == HTTPStatus.SERVICE_UNAVAILABLE:
+        raise HTTPException(
+            status_code=HTTPStatus.SERVICE_UNAVAILABLE,
+            detail='Service is busy, try again later'
+        )
     if not result:
         raise HTTPException(
             status_code=HTTPStatus.BAD_GATEWAY,
@@ -0,0 +1,184 @@
+from http import HTTPStatus
+from fastapi import APIRouter, Depends, HTTPException
+from typing import List
+
+from src.utils.oauth2 import get_current_user
+from src.schemas.entity import (
+    Permissions, PermissionCheck, PermissionsBatchCheck,
+    PermissionsBatchResult, UserInDB, Status
+)
+from src.services.permissions import permission_services, PermissionsService
+
+router = APIRouter()
+
+
+@router.post(
+    "",
+    response_model=Permissions,
+    status_code=HTTPStatus.ACCEPTED,
+    summary="Создать право",
+    tags=["Права"],
+)
+async def create_permission(
+    permission: Permissions,
+    current_user: UserInDB = Depends(get_current_user),
+    permission_service: PermissionsService = Depends(permission_services)
+):
+    permission = await permission_service.create_permission(
+        name=permission.name,
+        description=permission.description
+    )
+    if permission == HTTPStatus.BAD_REQUEST:
+        raise HTTPException(
+            status_code=HTTPStatus.BAD_REQUEST,
+            detail="This permission exists"
+        )
+    if not permission:
+        raise HTTPException(
+            status_code=HTTPStatus.BAD_GATEWAY,
+            detail="Can't create permission"
+        )
+    return permission
+
+
+@router.get(
+    "",
+    response_model=List[Permissions],
+    status_code=HTTPStatus.ACCEPTED,
+    summary="Получить права",
+    tags=["Права"],
+)
+async def get_permissions(
+    current_user: UserInDB = Depends(get_current_user),
+    permission_service: PermissionsService = Depends(permission_services)
+):
+    result = await permission_service.get_permissions()
+    if result is None:
+        raise HTTPException(
+            status_code=HTTPStatus.BAD_GATEWAY,
+            detail="Can't get permissions"
+        )
+    return result
+
+
+@router.post(
+    "/role",
+    response_model=Status,
+    status_code=HTTPStatus.ACCEPTED,
+    summary="Выдать право роли",
+    tags=["Права"],
+)
+async def set_permission_to_role(
+    role_name: str,
+    permission_name: str,
+    current_user: UserInDB = Depends(get_current_user),
+    permission_service: PermissionsService = Depends(permission_services)
+):
+    result = await permission_service.set_permission_to_role(
+        role_name=role_name,
+        permission_name=permission_name
+    )
+    if result == HTTPStatus.BAD_REQUEST:
+        raise HTTPException(
+            status_code=HTTPStatus.BAD_REQUEST,
+            detail="Role is not exist"
+        )
+    if result == HTTPStatus.CONFLICT:
+        raise HTTPException(
+            status_code=HTTPStatus.CONFLICT,
+            detail="Permission is not exist"
+        )
+    if not result:
+        raise HTTPException(
+            status_code=HTTPStatus.BAD_GATEWAY,
+            detail="Can't set a permission"
+        )
+    return result
+
+
+@router.delete(
+    "/role",
+    response_model=Status,
+    status_code=HTTPStatus.ACCEPTED,
+    summary="Отозвать право у роли",
+    tags=["Права"],
+)
+async def delete_permission_from_role(
+    role_name: str,
+    permission_name: str,
+    current_user: UserInDB = Depends(get_current_user),
+    permission_service: PermissionsService = Depends(permission_services)
+):
+    result = await permission_service.delete_permission_from_role(
+        role_name=role_name,
+        permission_name=permission_name
+    )
+    if result == HTTPStatus.BAD_REQUEST:
+        raise HTTPException(
+            status_code=HTTPStatus.BAD_REQUEST,
+            detail="Role is not exist"
+        )
+    if result == HTTPStatus.CONFLICT:
+        raise HTTPException(
+            status_code=HTTPStatus.CONFLICT,
+            detail="Permission is not exist"
+        )
+    if not result:
+        raise HTTPException(
+            status_code=HTTPStatus.BAD_GATEWAY,
+            detail="Can't delete a permission"
+        )
+    return result
+
+
+@router.get(
+    "/check",
+    response_model=PermissionCheck,
+    status_code=HTTPStatus.OK,
+    summary="Проверить право пользователя",
+    tags=["Права"],
+)
+async def check_permission(
+    permission: str,
+    current_user: UserInDB = Depends(get_current_user),
+    permission_service: PermissionsService = Depends(permission_services)
+):
+    allowed = await permission_service.check_permission(
+        user_id=current_user.id,
+        permission=permission
+    )
+    if allowed is None:
+        raise HTTPException(
+            status_code=HTTPStatus.BAD_GATEWAY,
+            detail="Can't check permission"
+        )
+    if allowed is HTTPStatus.BAD_REQUEST:
+        raise HTTPException(
+            status_code=HTTPStatus.BAD_REQUEST,
+            detail="Permission is not exist"
+        )
+    return PermissionCheck(permission=permission, allowed=allowed)
+
+
+@router.post(
+    "/check",
+    response_model=PermissionsBatchResult,
+    status_code=HTTPStatus.OK,
+    summary="Проверить доступ пользователя к списку меток",
+    tags=["Права"],
+)
+async def check_permissions(
+    batch: PermissionsBatchCheck,
+    current_user: UserInDB = Depends(get_current_user),
+    permission_service: PermissionsService = Depends(permission_services)
+):
+    allowed = await permission_service.check_permissions(
+        user_id=current_user.id,
+        labels=batch.labels
+    )
+    if allowed is None:
+        raise HTTPException(
+            status_code=HTTPStatus.BAD_GATEWAY,
+            detail="Can't check permissions"
+        )
+    return PermissionsBatchResult(allowed=allowed)
@@ -1,6 +1,7 @@
 from http import HTTPStatus
-from fastapi import APIRouter, Depends, HTTPException
-from typing import List
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
+from fastapi.responses import ORJSONResponse
+from typing import List, Optional
 
 from src.utils.oauth2 import get_current_user
 from src.schemas.entity import Roles, UserInDB, Status
@@ -80,15 +81,24 @@ async def change_role(
 )
 async def get_roles(
     current_user: UserInDB = Depends(get_current_user),
-    role_service: RolesService = Depends(role_services)
+    role_service: RolesService = Depends(role_services),
+    if_none_match: Optional[str] = Header(None),
 ):
-    result = await role_service.get_roles()
-    if not result:
+    result = await role_service.get_roles(if_none_match=if_none_match)
+    if result is None:
         raise HTTPException(
             status_code=HTTPStatus.BAD_GATEWAY,
             detail="Can't change rolw"
         )
-    return result
+    etag, roles = result
+    if roles is None:
+        return Response(
+            status_code=HTTPStatus.NOT_MODIFIED, headers={'ETag': etag}
+        )
+    # роли из кэша уже сериализуемы, повторная валидация не нужна
+    return ORJSONResponse(
+        content=roles, status_code=HTTPStatus.ACCEPTED, headers={'ETag': etag}
+    )
 
 
 @router.delete(
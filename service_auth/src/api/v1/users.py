@@ -1,6 +1,6 @@
 from http import HTTPStatus
-from fastapi import APIRouter, Depends, HTTPException, Query
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from typing import List, Optional
 
 from src.utils.oauth2 import get_current_user
 from src.schemas.entity import (
@@ -30,23 +30,34 @@ async def read_users_me(current_user: UserInDB = Depends(get_current_user)):
     tags=['Пользователь']
 )
 async def get_account_history(
+    response: Response,
     current_user: UserInDB = Depends(get_current_user),
     service_user: UserService = Depends(user_service),
-    page: int = Query(1, ge=1),
+    cursor: Optional[str] = Query(None),
+    page: Optional[int] = Query(None, ge=1),
     page_size: int = Query(10, ge=1, le=100),
 ) -> List[ShemaAccountHistory]:
-    result = await service_user.get_account_history(current_user.id)
-    if not result:
+    result = await service_user.get_account_history(
+        user_id=current_user.id,
+        page_size=page_size,
+        cursor=cursor,
+        page=page,
+    )
+    if result == HTTPStatus.BAD_REQUEST:
+        raise HTTPException(
+            status_code=HTTPStatus.BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+    if result is None:
         raise HTTPException(
             status_code=HTTPStatus.BAD_GATEWAY,
             detail="Can't get account history"
         )
 
-    start_index = (page - 1) * page_size
-    end_index = start_index + page_size
-    paginated_result = result[start_index:end_index]
-
-    return paginated_result
+    history, next_cursor = result
+    if next_cursor:
+        response.headers['X-Next-Cursor'] = next_cursor
+    return history
 
 
 @router.put(
@@ -80,6 +91,12 @@ async def change_password(
             detail='Invalid password'
         )
 
+    if result == HTTPStatus.SERVICE_UNAVAILABLE:
+        raise HTTPException(
+            status_code=HTTPStatus.SERVICE_UNAVAILABLE,
+            detail='Service is busy, try again later'
+        )
+
     if not result:
         raise HTTPException(
             status_code=HTTPStatus.BAD_GATEWAY,
@@ -123,6 +140,12 @@ async def change_email(
             detail='Invalid password'
         )
 
+    if result == HTTPStatus.SERVICE_UNAVAILABLE:
+        raise HTTPException(
+            status_code=HTTPStatus.SERVICE_UNAVAILABLE,
+            detail='Service is busy, try again later'
+        )
+
     if not result:
         raise HTTPException(
             status_code=HTTPStatus.BAD_GATEWAY,
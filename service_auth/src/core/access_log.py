@@ -0,0 +1,80 @@
+import logging
+import os
+import random
+import time
+
+from src.core.config import settings
+
+REDACTED = '***'
+
+# Вывод идёт через очередь, см. src.core.logger.queue_logging
+access_logger = logging.getLogger('access')
+
+
+class AccessLogMiddleware:
+    """ASGI-middleware: одна строка на запрос, с выборкой и скрытием заголовков."""
+
+    def __init__(
+        self,
+        app,
+        sample_rate: float = settings.access_log_sample_rate,
+        slow_ms: float = settings.access_log_slow_ms,
+        log_headers: bool = settings.access_log_headers,
+        redact_headers: str = settings.access_log_redact_headers,
+    ) -> None:
+        self.app = app
+        self.sample_rate = sample_rate
+        self.slow_ms = slow_ms
+        self.log_headers = log_headers
+        self.redact_headers = {
+            name.strip().lower().encode('latin-1')
+            for name in redact_headers.split(',') if name.strip()
+        }
+
+    def _headers(self, raw_headers) -> dict:
+        return {
+            name.decode('latin-1'):
+                REDACTED if name in self.redact_headers else value.decode('latin-1')
+            for name, value in raw_headers
+        }
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message) -> None:
+            nonlocal status_code
+            if message['type'] == 'http.response.start':
+                status_code = message['status']
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration_ms = (time.perf_counter() - start) * 1000
+            if (
+                status_code >= 500
+                or duration_ms >= self.slow_ms
+                or random.random() < self.sample_rate
+            ):
+                self._log(scope, status_code, duration_ms)
+
+    def _log(self, scope, status_code: int, duration_ms: float) -> None:
+        client = scope.get('client')
+        rid = os.urandom(4).hex()
+        if self.log_headers:
+            access_logger.info(
+                'rid=%s method=%s path=%s status=%s duration_ms=%.2f client=%s headers=%s',
+                rid, scope['method'], scope['path'], status_code, duration_ms,
+                client[0] if client else '-', self._headers(scope['headers'])
+            )
+        else:
+            access_logger.info(
+                'rid=%s method=%s path=%s status=%s duration_ms=%.2f client=%s',
+                rid, scope['method'], scope['path'], status_code, duration_ms,
+                client[0] if client else '-'
+            )
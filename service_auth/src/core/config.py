@@ -1,9 +1,6 @@
 import os
-from logging import config as logging_config
 from pydantic import BaseSettings
 
-from src.core.logger import LOGGING
-
 
 class Settings(BaseSettings):
     # Название проекта. Используется в Swagger-документации
@@ -15,16 +12,70 @@ class Settings(BaseSettings):
     app_host: str = os.getenv("APP_HOST", "0.0.0.0")
     app_port: int = int(os.getenv("APP_PORT", 8000))
 
+    # Журнал запросов: доля записываемых запросов, ошибки и медленные пишутся всегда
+    access_log_sample_rate: float = float(os.getenv("ACCESS_LOG_SAMPLE_RATE", 1.0))
+    access_log_slow_ms: float = float(os.getenv("ACCESS_LOG_SLOW_MS", 500))
+    access_log_headers: bool = os.getenv(
+        "ACCESS_LOG_HEADERS", "False"
+    ).lower() in ("true", "1")
+    access_log_redact_headers: str = os.getenv(
+        "ACCESS_LOG_REDACT_HEADERS",
+        "authorization,cookie,set-cookie,proxy-authorization,x-api-key"
+    )
+
+    # Как часто состояние пулов переносится в метрики /metrics, секунды
+    metrics_pool_interval: float = float(os.getenv("METRICS_POOL_INTERVAL", 5))
+
+    # Трассировка: доля запросов со спанами, запросы с traceparent
+    # и флагом sampled трассируются всегда. Пустой файл - вывод в stdout.
+    tracing_sample_rate: float = float(os.getenv("TRACING_SAMPLE_RATE", 0.0))
+    tracing_file: str = os.getenv("TRACING_FILE", "")
+
     # Настройки Redis
     redis_host: str = os.getenv("REDIS_HOST", "127.0.0.1")
     redis_port: int = int(os.getenv("REDIS_PORT", 6379))
+    redis_max_connections: int = int(os.getenv("REDIS_MAX_CONNECTIONS", 50))
+    redis_pool_timeout: float = float(os.getenv("REDIS_POOL_TIMEOUT", 5))
+    redis_socket_timeout: float = float(os.getenv("REDIS_SOCKET_TIMEOUT", 2))
+    redis_socket_connect_timeout: float = float(
+        os.getenv("REDIS_SOCKET_CONNECT_TIMEOUT", 2)
+    )
+    redis_socket_keepalive: bool = os.getenv(
+        "REDIS_SOCKET_KEEPALIVE", "True"
+    ).lower() in ("true", "1")
+    redis_health_check_interval: int = int(
+        os.getenv("REDIS_HEALTH_CHECK_INTERVAL", 30)
+    )
 
     db_name: str = os.getenv("POSTGRES_DB", "auth_database")
     db_user: str = os.getenv("POSTGRES_USER", "auth")
     db_password: str = os.getenv("POSTGRES_PASSWORD", None)
     db_host: str = os.getenv("POSTGRES_HOST", "postgres")
     db_port: int = int(os.getenv("POSTGRES_PORT", 5432))
-    dsl_database: str = f"postgresql+asyncpg://{db_user}:{db_password}@{db_host}:{db_port}/{db_name}?async_fallback=True"
+    # Асинхронный драйвер: asyncpg или psycopg (psycopg3 в async-режиме)
+    db_driver: str = os.getenv("DB_DRIVER", "asyncpg")
+    dsl_database: str = f"postgresql+{db_driver}://{db_user}:{db_password}@{db_host}:{db_port}/{db_name}"
+    # Настройки пула соединений и логирования запросов
+    db_pool_size: int = int(os.getenv("DB_POOL_SIZE", 10))
+    db_max_overflow: int = int(os.getenv("DB_MAX_OVERFLOW", 10))
+    db_pool_timeout: float = float(os.getenv("DB_POOL_TIMEOUT", 30))
+    db_pool_recycle: int = int(os.getenv("DB_POOL_RECYCLE", 1800))
+    db_pool_pre_ping: bool = os.getenv(
+        "DB_POOL_PRE_PING", "True"
+    ).lower() in ("true", "1")
+    db_echo: bool = os.getenv("DB_ECHO", "False").lower() in ("true", "1")
+    db_statement_cache_size: int = int(os.getenv("DB_STATEMENT_CACHE_SIZE", 100))
+    db_slow_query_ms: int = int(os.getenv("DB_SLOW_QUERY_MS", 200))
+
+    # Отложенная пачечная запись истории входов
+    HISTORY_BATCH_SIZE: int = int(os.getenv("HISTORY_BATCH_SIZE", 500))
+    HISTORY_FLUSH_INTERVAL: float = float(os.getenv("HISTORY_FLUSH_INTERVAL", 1))
+    HISTORY_BUFFER_MAX_SIZE: int = int(os.getenv("HISTORY_BUFFER_MAX_SIZE", 10000))
+    # drop_oldest или drop_new
+    HISTORY_OVERFLOW_POLICY: str = os.getenv("HISTORY_OVERFLOW_POLICY", "drop_oldest")
+    # Секции истории входов: сколько месяцев хранить и на сколько вперёд создавать
+    HISTORY_RETENTION_MONTHS: int = int(os.getenv("HISTORY_RETENTION_MONTHS", 12))
+    HISTORY_PREMAKE_MONTHS: int = int(os.getenv("HISTORY_PREMAKE_MONTHS", 3))
     # Корень проекта
     base_dir: str = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
@@ -34,9 +85,31 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRES_IN: int = os.getenv('ACCESS_TOKEN_EXPIRES_IN', 60)
     JWT_ALGORITHM: str = os.getenv('ALGORITHM', 'RS256')
     SAULT: str = os.getenv('SAULT', '')
+    # Кэш email и is_active пользователя в Redis
+    USER_STATUS_CACHE_TTL: int = int(os.getenv('USER_STATUS_CACHE_TTL', 300))
+    # Кэш ролей пользователя: в Redis и коротко в памяти воркера
+    ROLES_CACHE_TTL: int = int(os.getenv('ROLES_CACHE_TTL', 3600))
+    ROLES_LOCAL_CACHE_TTL: int = int(os.getenv('ROLES_LOCAL_CACHE_TTL', 5))
+    ROLES_LOCAL_CACHE_SIZE: int = int(os.getenv('ROLES_LOCAL_CACHE_SIZE', 10000))
+    # Список ролей для GET /roles, кэшируется под номером версии
+    ROLES_CATALOGUE_CACHE_TTL: int = int(
+        os.getenv('ROLES_CATALOGUE_CACHE_TTL', 3600)
+    )
+    # Скомпилированные битовые маски прав ролей
+    PERMISSIONS_CACHE_TTL: int = int(os.getenv('PERMISSIONS_CACHE_TTL', 3600))
+    PERMISSIONS_LOCAL_CACHE_TTL: int = int(
+        os.getenv('PERMISSIONS_LOCAL_CACHE_TTL', 5)
+    )
+    # Алгоритм хэширования паролей: pbkdf2, bcrypt, argon2 или scrypt
+    PASSWORD_HASHER: str = os.getenv('PASSWORD_HASHER', 'pbkdf2')
+    # 0 - стоимость по умолчанию для выбранного алгоритма
+    PASSWORD_HASHER_COST: int = int(os.getenv('PASSWORD_HASHER_COST', 0))
+    # Пул для хэширования паролей: thread или process
+    PASSWORD_HASHING_EXECUTOR: str = os.getenv('PASSWORD_HASHING_EXECUTOR', 'thread')
+    PASSWORD_HASHING_WORKERS: int = int(os.getenv('PASSWORD_HASHING_WORKERS', 4))
+    PASSWORD_HASHING_QUEUE_SIZE: int = int(os.getenv('PASSWORD_HASHING_QUEUE_SIZE', 64))
+    ACCESS_TOKEN_CACHE_SIZE: int = int(os.getenv('ACCESS_TOKEN_CACHE_SIZE', 10000))
+    ACCESS_TOKEN_CACHE_TTL: int = int(os.getenv('ACCESS_TOKEN_CACHE_TTL', 5))
 
 
 settings = Settings()
-
-# Применяем настройки логирования
-logging_config.dictConfig(LOGGING)
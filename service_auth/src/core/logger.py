@@ -1,4 +1,16 @@
-LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+import logging
+import os
+import queue
+
+from logging.handlers import QueueHandler, QueueListener
+
+LOG_FORMAT = (
+    '%(asctime)s loglevel=%(levelname)-6s logger=%(name)s '
+    '%(funcName)s() L%(lineno)-4d %(message)s'
+)
+ACCESS_LOG_FORMAT = '%(asctime)s loglevel=%(levelname)-6s logger=%(name)s %(message)s'
+# WARNING отключает построчные записи сервисов, %-форматирование при этом не выполняется
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
 LOG_DEFAULT_HANDLERS = [
     'console',
 ]
@@ -12,29 +24,29 @@ LOGGING = {
         'verbose': {
             'format': LOG_FORMAT,
         },
+        'access_log': {
+            'format': ACCESS_LOG_FORMAT,
+        },
         'default': {
             '()': 'uvicorn.logging.DefaultFormatter',
             'fmt': '%(levelprefix)s %(message)s',
             'use_colors': None,
         },
-        'access': {
-            '()': 'uvicorn.logging.AccessFormatter',
-            'fmt': "%(levelprefix)s %(client_addr)s - '%(request_line)s' %(status_code)s",
-        },
     },
     'handlers': {
         'console': {
             'level': 'DEBUG',
             'class': HANDLER_CLASS,
             'formatter': 'verbose',
+            'stream': 'ext://sys.stdout',
         },
-        'default': {
-            'formatter': 'default',
+        'access_log': {
             'class': HANDLER_CLASS,
+            'formatter': 'access_log',
             'stream': 'ext://sys.stdout',
         },
-        'access': {
-            'formatter': 'access',
+        'default': {
+            'formatter': 'default',
             'class': HANDLER_CLASS,
             'stream': 'ext://sys.stdout',
         },
@@ -42,20 +54,83 @@ LOGGING = {
     'loggers': {
         '': {
             'handlers': LOG_DEFAULT_HANDLERS,
+            'level': LOG_LEVEL,
+        },
+        'access': {
+            'handlers': ['access_log'],
             'level': 'INFO',
+            'propagate': False,
         },
         'uvicorn.error': {
             'level': 'INFO',
         },
+        # строку на запрос пишет AccessLogMiddleware, своя у uvicorn не нужна
         'uvicorn.access': {
-            'handlers': ['access'],
-            'level': 'INFO',
+            'handlers': [],
+            'level': 'WARNING',
             'propagate': False,
         },
     },
     'root': {
-        'level': 'INFO',
+        'level': LOG_LEVEL,
         'formatter': 'verbose',
         'handlers': LOG_DEFAULT_HANDLERS,
     },
 }
+
+
+class LocalQueueHandler(QueueHandler):
+    """QueueHandler без копирования и форматирования записи.
+
+    Запись не покидает процесс, поэтому её можно отдать слушателю как
+    есть: сообщение соберёт форматтер в его потоке. record.args при
+    этом сохраняются, они нужны, например, AccessFormatter uvicorn.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+class QueueLogging:
+    """Переносит обработчики логгеров в фоновый поток.
+
+    Логгер пишет запись в очередь, а форматирование и вывод
+    выполняет QueueListener, поэтому event loop не ждёт stdout.
+    """
+
+    def __init__(self, *names: str) -> None:
+        self.names = names
+        self._listeners = []
+
+    def start(self) -> None:
+        for name in self.names:
+            logger = logging.getLogger(name or None)
+            handlers = [
+                handler for handler in logger.handlers
+                if not isinstance(handler, QueueHandler)
+            ]
+            if not handlers:
+                continue
+            log_queue = queue.SimpleQueue()
+            for handler in handlers:
+                logger.removeHandler(handler)
+            logger.addHandler(LocalQueueHandler(log_queue))
+            listener = QueueListener(
+                log_queue, *handlers, respect_handler_level=True
+            )
+            listener.start()
+            self._listeners.append((logger, handlers, listener))
+
+    def stop(self) -> None:
+        # stop дожидается вывода всего, что уже лежит в очереди
+        for logger, handlers, listener in self._listeners:
+            listener.stop()
+            for handler in list(logger.handlers):
+                if isinstance(handler, QueueHandler):
+                    logger.removeHandler(handler)
+            for handler in handlers:
+                logger.addHandler(handler)
+        self._listeners = []
+
+
+queue_logging = QueueLogging('', 'access')
@@ -0,0 +1,192 @@
+import functools
+import inspect
+import os
+import time
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+from starlette.responses import Response
+
+# Воркеры gunicorn пишут значения в файлы этого каталога,
+# /metrics любого воркера суммирует их (см. src/gunicorn_conf.py)
+MULTIPROC_DIR = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+if MULTIPROC_DIR:
+    os.makedirs(MULTIPROC_DIR, exist_ok=True)
+
+STORAGE_BUCKETS = (
+    .0005, .001, .0025, .005, .01, .025, .05, .1, .25, .5, 1.0, 2.5
+)
+
+REQUEST_DURATION = Histogram(
+    'http_request_duration_seconds',
+    'Время обработки HTTP-запроса',
+    ['method', 'route'],
+)
+REQUESTS_TOTAL = Counter(
+    'http_requests_total',
+    'HTTP-запросы по статусу ответа',
+    ['method', 'route', 'status'],
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    'http_requests_in_progress',
+    'Запросы в обработке',
+    ['method'],
+    multiprocess_mode='livesum',
+)
+DB_CALL_DURATION = Histogram(
+    'db_call_duration_seconds',
+    'Время вызова метода DbService',
+    ['method'],
+    buckets=STORAGE_BUCKETS,
+)
+REDIS_CALL_DURATION = Histogram(
+    'redis_call_duration_seconds',
+    'Время вызова метода RedisService',
+    ['method'],
+    buckets=STORAGE_BUCKETS,
+)
+DB_STATEMENTS = Counter(
+    'db_statements',
+    'Запросы к Postgres от обработчиков API, без фоновой записи',
+)
+REDIS_POOL_WAIT = Histogram(
+    'redis_pool_wait_seconds',
+    'Ожидание свободного соединения пула Redis',
+    buckets=STORAGE_BUCKETS,
+)
+DB_POOL_CONNECTIONS = Gauge(
+    'db_pool_connections',
+    'Соединения пула Postgres',
+    ['state'],
+    multiprocess_mode='livesum',
+)
+REDIS_POOL_CONNECTIONS = Gauge(
+    'redis_pool_connections',
+    'Соединения пула Redis',
+    ['state'],
+    multiprocess_mode='livesum',
+)
+HASHING_POOL_TASKS = Gauge(
+    'password_hashing_tasks',
+    'Задачи пула хэширования паролей',
+    ['state'],
+    multiprocess_mode='livesum',
+)
+HISTORY_BUFFER_SIZE = Gauge(
+    'account_history_buffered',
+    'Записи истории входов, ожидающие записи в базу',
+    multiprocess_mode='livesum',
+)
+HASHING_POOL_WAIT = Histogram(
+    'password_hashing_wait_seconds',
+    'Ожидание задачи хэширования в очереди пула',
+)
+HASHING_POOL_RESULTS = Counter(
+    'password_hashing_results',
+    'Задачи пула хэширования: выполненные и отклонённые',
+    ['result'],
+)
+HISTORY_BUFFER_ROWS = Counter(
+    'account_history_rows',
+    'Записи истории входов: записанные в базу и отброшенные',
+    ['result'],
+)
+HISTORY_FLUSH_ERRORS = Counter(
+    'account_history_flush_errors',
+    'Неудачные записи пачки истории входов в базу',
+)
+CACHE_LOOKUPS = Counter(
+    'cache_lookups',
+    'Обращения к кэшам по результату',
+    ['cache', 'result'],
+)
+
+
+def observe_calls(histogram: Histogram):
+    """Декоратор класса: время каждого публичного async-метода."""
+
+    def decorate(cls):
+        for name, func in list(vars(cls).items()):
+            if name.startswith('_') or not inspect.iscoroutinefunction(func):
+                continue
+            setattr(cls, name, _timed(histogram.labels(method=name), func))
+        return cls
+
+    return decorate
+
+
+def _timed(metric, func):
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return await func(*args, **kwargs)
+        finally:
+            metric.observe(time.perf_counter() - start)
+
+    return wrapper
+
+
+class MetricsMiddleware:
+    """ASGI-middleware: длительность, статус и число запросов в обработке."""
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        method = scope['method']
+        in_progress = REQUESTS_IN_PROGRESS.labels(method=method)
+        in_progress.inc()
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message) -> None:
+            nonlocal status_code
+            if message['type'] == 'http.response.start':
+                status_code = message['status']
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            in_progress.dec()
+            # шаблон пути, а не сам путь: иначе id в URL размножат ряды.
+            # Служебные маршруты starlette (openapi, /metrics) без параметров.
+            route = scope.get('route')
+            if route is not None:
+                route = route.path
+            else:
+                route = scope['path'] if 'endpoint' in scope else 'unmatched'
+            REQUEST_DURATION.labels(method=method, route=route).observe(
+                time.perf_counter() - start
+            )
+            REQUESTS_TOTAL.labels(
+                method=method, route=route, status=status_code
+            ).inc()
+
+
+def _collect() -> bytes:
+    if not MULTIPROC_DIR:
+        return generate_latest(REGISTRY)
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return generate_latest(registry)
+
+
+async def metrics(request: Request) -> Response:
+    # при нескольких воркерах читаются файлы, не делаем этого в event loop
+    return Response(await run_in_threadpool(_collect), media_type=CONTENT_TYPE_LATEST)
@@ -1,6 +1,12 @@
 import base64
+import json
+import time
 from typing import List
+
+import jwt
 from async_fastapi_jwt_auth import AuthJWT
+from jwt.algorithms import get_default_algorithms
+from jwt.utils import base64url_decode
 from pydantic import BaseModel
 
 from .config import settings
@@ -22,3 +28,47 @@ class Settings(BaseModel):
 @AuthJWT.load_config
 def get_config():
     return Settings()
+
+
+class TokenError(Exception):
+    pass
+
+
+class TokenTypeError(TokenError):
+    pass
+
+
+# Ключ разбираем один раз, а не на каждой проверке подписи
+_verify_key = get_default_algorithms()[settings.JWT_ALGORITHM].prepare_key(
+    Settings().authjwt_public_key
+)
+
+
+def decode_token(token: str, token_type: str = 'access') -> dict:
+    """Проверяет токен и возвращает его claims за один проход.
+
+    Сначала без криптографии отбрасываются битые, чужого типа и
+    просроченные токены, и только потом проверяется подпись.
+    """
+    try:
+        payload = json.loads(base64url_decode(token.split('.')[1]))
+    except Exception as err:
+        raise TokenError('Malformed token') from err
+
+    if not isinstance(payload, dict):
+        raise TokenError('Malformed token')
+    if payload.get('type') != token_type:
+        raise TokenTypeError(f'Token type must be {token_type}')
+    exp = payload.get('exp')
+    if not isinstance(exp, (int, float)) or exp <= time.time():
+        raise TokenError('Token is expired')
+
+    try:
+        return jwt.decode(
+            token,
+            _verify_key,
+            algorithms=[settings.JWT_ALGORITHM],
+            options={'require': ['exp', 'sub']},
+        )
+    except jwt.PyJWTError as err:
+        raise TokenError(str(err)) from err
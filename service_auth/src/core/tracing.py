@@ -0,0 +1,219 @@
+import functools
+import inspect
+import json
+import os
+import queue
+import random
+import re
+import sys
+import threading
+import time
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+from src.core.config import settings
+
+# traceparent по W3C Trace Context: версия-trace_id-span_id-флаги
+TRACEPARENT_RE = re.compile(
+    r'^[0-9a-f]{2}-(?P<trace_id>[0-9a-f]{32})-(?P<span_id>[0-9a-f]{16})-(?P<flags>[0-9a-f]{2})$'
+)
+
+
+class Span:
+    __slots__ = (
+        'trace_id', 'span_id', 'parent_id', 'name',
+        'attributes', 'status', 'start', '_started'
+    )
+
+    def __init__(
+        self,
+        trace_id: str,
+        parent_id: Optional[str],
+        name: str,
+        attributes: dict,
+    ) -> None:
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.name = name
+        self.attributes = attributes
+        self.status = 'ok'
+        self.start = time.time()
+        self._started = time.perf_counter()
+
+    def to_dict(self) -> dict:
+        return {
+            'trace_id': self.trace_id,
+            'span_id': self.span_id,
+            'parent_id': self.parent_id,
+            'name': self.name,
+            'start': round(self.start, 6),
+            'duration_ms': round((time.perf_counter() - self._started) * 1000, 3),
+            'status': self.status,
+            'attributes': self.attributes,
+        }
+
+
+class SpanExporter:
+    """Пишет завершённые спаны JSON-строками в файл или stdout.
+
+    Сериализация и запись идут в отдельном потоке, event loop
+    только кладёт словарь в очередь.
+    """
+
+    def __init__(self, path: str = '') -> None:
+        self.path = path
+        self.exported = 0
+        self._queue = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+
+    def export(self, span: dict) -> None:
+        if self._thread is not None:
+            self._queue.put(span)
+
+    def _run(self) -> None:
+        stream = open(self.path, 'a', encoding='utf-8') if self.path else sys.stdout
+        try:
+            while True:
+                span = self._queue.get()
+                if span is None:
+                    break
+                stream.write(json.dumps(span, default=str) + '\n')
+                self.exported += 1
+                if self._queue.empty():
+                    stream.flush()
+        finally:
+            stream.flush()
+            if stream is not sys.stdout:
+                stream.close()
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+
+span_exporter = SpanExporter(path=settings.tracing_file)
+
+_current_span: ContextVar[Optional[Span]] = ContextVar('current_span', default=None)
+
+
+@contextmanager
+def start_span(name: str, **attributes):
+    # вне трассы (запрос не попал в выборку) спаны не создаются
+    parent = _current_span.get()
+    if parent is None:
+        yield None
+        return
+    span = Span(parent.trace_id, parent.span_id, name, attributes)
+    token = _current_span.set(span)
+    try:
+        yield span
+    except BaseException:
+        span.status = 'error'
+        raise
+    finally:
+        _current_span.reset(token)
+        span_exporter.export(span.to_dict())
+
+
+def trace_calls(prefix: str):
+    """Декоратор класса: спан на каждый публичный async-метод."""
+
+    def decorate(cls):
+        for name, func in list(vars(cls).items()):
+            if name.startswith('_') or not inspect.iscoroutinefunction(func):
+                continue
+            setattr(cls, name, traced(f'{prefix}.{name}')(func))
+        return cls
+
+    return decorate
+
+
+def traced(span_name: str):
+    """Декоратор async-функции: спан на каждый вызов."""
+
+    def decorate(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            if _current_span.get() is None:
+                return await func(*args, **kwargs)
+            with start_span(span_name):
+                return await func(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+class TracingMiddleware:
+    """ASGI-middleware: корневой спан запроса.
+
+    trace id берётся из заголовка traceparent, если он есть, и
+    возвращается клиенту в X-Trace-Id.
+    """
+
+    def __init__(
+        self,
+        app,
+        sample_rate: float = settings.tracing_sample_rate,
+    ) -> None:
+        self.app = app
+        self.sample_rate = sample_rate
+
+    def _parent(self, scope) -> tuple:
+        for name, value in scope['headers']:
+            if name == b'traceparent':
+                match = TRACEPARENT_RE.match(value.decode('latin-1').strip())
+                if match:
+                    sampled = int(match['flags'], 16) & 1
+                    return match['trace_id'], match['span_id'], bool(sampled)
+        return None, None, False
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        trace_id, parent_id, sampled = self._parent(scope)
+        if not sampled and random.random() >= self.sample_rate:
+            await self.app(scope, receive, send)
+            return
+
+        span = Span(
+            trace_id or os.urandom(16).hex(),
+            parent_id,
+            scope['method'],
+            {'http.method': scope['method'], 'http.path': scope['path']}
+        )
+        token = _current_span.set(span)
+
+        async def send_wrapper(message) -> None:
+            if message['type'] == 'http.response.start':
+                span.attributes['http.status_code'] = message['status']
+                message['headers'] = list(message.get('headers', [])) + [
+                    (b'x-trace-id', span.trace_id.encode('latin-1'))
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except BaseException:
+            span.status = 'error'
+            raise
+        finally:
+            _current_span.reset(token)
+            # имя корневого спана - маршрут, он же охватывает обработчик
+            route = scope.get('route')
+            if route is not None:
+                span.attributes['http.route'] = route.path
+                span.name = f"{scope['method']} {route.path}"
+            span_exporter.export(span.to_dict())
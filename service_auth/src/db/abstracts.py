@@ -16,17 +16,37 @@ class AsyncCacheService(abc.ABC):
         pass
 
     @abc.abstractmethod
-    async def get(self, user_id: str) -> Optional[dict]:
+    async def has_token(self, user_id: str, access_token: str) -> bool:
+        pass
+
+    @abc.abstractmethod
+    async def remove_token(self, user_id: str, user_agent: str) -> None:
+        pass
+
+    @abc.abstractmethod
+    async def get(self, name: str) -> Optional[dict]:
         pass
 
     @abc.abstractmethod
     async def set(self, name: str, value: str, ex: timedelta = None) -> None:
         pass
 
+    @abc.abstractmethod
+    async def get_version(self, name: str) -> int:
+        pass
+
+    @abc.abstractmethod
+    async def bump_version(self, name: str) -> None:
+        pass
+
     @abc.abstractmethod
     async def delete(self, user_id: str) -> None:
         pass
 
+    @abc.abstractmethod
+    async def delete_keys(self, *names: str) -> None:
+        pass
+
 
 class AsyncDbService(abc.ABC):
 
@@ -34,6 +54,14 @@ class AsyncDbService(abc.ABC):
     async def insert_data(self, data) -> None:
         pass
 
+    @abc.abstractmethod
+    def add_data(self, data) -> None:
+        pass
+
+    @abc.abstractmethod
+    async def commit(self) -> None:
+        pass
+
     @abc.abstractmethod
     async def simple_select(
         self,
@@ -50,6 +78,7 @@ class AsyncDbService(abc.ABC):
         what_update,
         values_update: dict,
         where_update: list = None,
+        commit: bool = True,
     ):
         pass
 
@@ -70,6 +99,10 @@ class AsyncDbService(abc.ABC):
     ):
         pass
 
+    @abc.abstractmethod
+    async def deactivate_refresh_tokens(self, user_id) -> None:
+        pass
+
     @abc.abstractmethod
     async def simple_delete(
         self,
@@ -81,3 +114,21 @@ class AsyncDbService(abc.ABC):
     @abc.abstractmethod
     async def get_user_roles(self, user_id) -> list:
         pass
+
+    @abc.abstractmethod
+    async def get_permissions_map(self) -> dict:
+        pass
+
+    @abc.abstractmethod
+    async def get_account_history(
+        self,
+        user_id,
+        limit: int,
+        after: tuple = None,
+        offset: int = None,
+    ) -> list:
+        pass
+
+    @abc.abstractmethod
+    async def get_user_with_roles(self, where_select: list):
+        pass
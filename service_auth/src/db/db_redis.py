@@ -1,20 +1,183 @@
+import hashlib
+import hmac
 import json
+import time
 
 from datetime import timedelta
 from typing import Optional
-from redis.asyncio import Redis
+from redis.asyncio import Redis, BlockingConnectionPool
+from redis.commands.core import AsyncScript
 from src.core.config import settings
+from src.core.metrics import REDIS_CALL_DURATION, REDIS_POOL_WAIT, observe_calls
+from src.core.tracing import trace_calls
 from .abstracts import AsyncCacheService
 
 redis: Optional[Redis] = None
 
 
+class MonitoredConnectionPool(BlockingConnectionPool):
+    """Пул соединений, который считает ожидание и занятые соединения."""
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        # выданные соединения: при ошибке connect() пул сам вызывает release
+        # для соединения, которое так и не было выдано
+        self._in_use = set()
+        self.waiting = 0
+
+    async def get_connection(self, command_name, *keys, **options):
+        self.waiting += 1
+        start = time.perf_counter()
+        try:
+            connection = await super().get_connection(
+                command_name, *keys, **options
+            )
+        finally:
+            self.waiting -= 1
+        REDIS_POOL_WAIT.observe(time.perf_counter() - start)
+        self._in_use.add(connection)
+        return connection
+
+    async def release(self, connection) -> None:
+        self._in_use.discard(connection)
+        await super().release(connection)
+
+    @property
+    def in_use(self) -> int:
+        return len(self._in_use)
+
+    def stats(self) -> dict:
+        return {
+            'max_connections': self.max_connections,
+            'in_use': self.in_use,
+            'waiting': self.waiting,
+        }
+
+
+def create_redis() -> Redis:
+    pool = MonitoredConnectionPool(
+        host=settings.redis_host,
+        port=settings.redis_port,
+        max_connections=settings.redis_max_connections,
+        timeout=settings.redis_pool_timeout,
+        socket_timeout=settings.redis_socket_timeout,
+        socket_connect_timeout=settings.redis_socket_connect_timeout,
+        socket_keepalive=settings.redis_socket_keepalive,
+        health_check_interval=settings.redis_health_check_interval,
+    )
+    return Redis(connection_pool=pool)
+
+
+def get_pool_stats() -> dict:
+    if redis is None:
+        return {}
+    return redis.connection_pool.stats()
+
+
 # Функция понадобится при внедрении зависимостей
 async def get_redis() -> Optional[Redis]:
-    redis = Redis(host=settings.redis_host, port=settings.redis_port)
     return redis
 
 
+# Сессии пользователя лежат в hash sessions:<user_id>, поле - устройство
+# (user agent), значение - "<expires_at_ms>:<отпечаток токена>". Срок жизни у каждого
+# устройства свой, ключ живёт до самого позднего из них. Старый формат
+# (JSON-строка под ключом <user_id>) переносится в hash при первом входе,
+# в нём и в записях до перехода на отпечатки лежат полные токены.
+_NOW_MS = """
+local now = redis.call('TIME')
+local now_ms = tonumber(now[1]) * 1000 + math.floor(tonumber(now[2]) / 1000)
+"""
+
+ADD_TOKEN_SCRIPT = _NOW_MS + """
+local ttl = tonumber(ARGV[3])
+local legacy = redis.call('GET', KEYS[2])
+if legacy then
+    local legacy_ttl = redis.call('PTTL', KEYS[2])
+    local ok, tokens = pcall(cjson.decode, legacy)
+    if ok and type(tokens) == 'table' and legacy_ttl > 0 then
+        for device, token in pairs(tokens) do
+            redis.call(
+                'HSETNX', KEYS[1], device, (now_ms + legacy_ttl) .. ':' .. token
+            )
+        end
+    end
+    redis.call('DEL', KEYS[2])
+end
+redis.call('HSET', KEYS[1], ARGV[1], (now_ms + ttl) .. ':' .. ARGV[2])
+local fields = redis.call('HGETALL', KEYS[1])
+for i = 1, #fields, 2 do
+    local expires = tonumber(string.match(fields[i + 1], '^(%d+):'))
+    if expires == nil or expires <= now_ms then
+        redis.call('HDEL', KEYS[1], fields[i])
+    end
+end
+if redis.call('PTTL', KEYS[1]) < ttl then
+    redis.call('PEXPIRE', KEYS[1], ttl)
+end
+return 1
+"""
+
+ACTIVE_TOKENS_SCRIPT = _NOW_MS + """
+local result = {}
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    for _, value in ipairs(redis.call('HVALS', KEYS[1])) do
+        local expires, token = string.match(value, '^(%d+):(.*)$')
+        if token and tonumber(expires) > now_ms then
+            table.insert(result, token)
+        end
+    end
+    return result
+end
+local legacy = redis.call('GET', KEYS[2])
+if legacy then
+    local ok, tokens = pcall(cjson.decode, legacy)
+    if ok and type(tokens) == 'table' then
+        for _, token in pairs(tokens) do
+            table.insert(result, token)
+        end
+    end
+end
+return result
+"""
+
+REMOVE_TOKEN_SCRIPT = """
+local removed = redis.call('HDEL', KEYS[1], ARGV[1])
+local legacy = redis.call('GET', KEYS[2])
+if legacy then
+    local ok, tokens = pcall(cjson.decode, legacy)
+    if ok and type(tokens) == 'table' and tokens[ARGV[1]] then
+        tokens[ARGV[1]] = nil
+        removed = removed + 1
+        if next(tokens) == nil then
+            redis.call('DEL', KEYS[2])
+        else
+            redis.call('SET', KEYS[2], cjson.encode(tokens), 'KEEPTTL')
+        end
+    end
+end
+return removed
+"""
+
+# Скрипты создаются один раз на процесс, клиент передаётся при вызове;
+# байтовый текст не требует кодировщика клиента для подсчёта sha
+ADD_TOKEN = AsyncScript(None, ADD_TOKEN_SCRIPT.encode('utf-8'))
+ACTIVE_TOKENS = AsyncScript(None, ACTIVE_TOKENS_SCRIPT.encode('utf-8'))
+REMOVE_TOKEN = AsyncScript(None, REMOVE_TOKEN_SCRIPT.encode('utf-8'))
+
+FINGERPRINT_LENGTH = 32
+
+
+def sessions_key(user_id: str) -> str:
+    return f'sessions:{user_id}'
+
+
+def token_fingerprint(token: str) -> str:
+    return hashlib.sha256(token.encode('utf-8')).hexdigest()[:FINGERPRINT_LENGTH]
+
+
+@trace_calls('redis')
+@observe_calls(REDIS_CALL_DURATION)
 class RedisService(AsyncCacheService):
     def __init__(self, redis: Redis) -> None:
         self.redis = redis
@@ -25,18 +188,42 @@ class RedisService(AsyncCacheService):
         access_token: str,
         user_agent: str
     ) -> None:
-        redis_user = await self.redis.get(user_id)
-        values = json.loads(redis_user) if redis_user else {}
-        values[user_agent] = access_token
-
-        await self.redis.set(
-            name=user_id,
-            value=json.dumps(values),
-            ex=timedelta(minutes=settings.ACCESS_TOKEN_EXPIRES_IN)
+        ttl = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRES_IN)
+        await ADD_TOKEN(
+            keys=[sessions_key(user_id), str(user_id)],
+            args=[
+                user_agent,
+                token_fingerprint(access_token),
+                int(ttl.total_seconds() * 1000)
+            ],
+            client=self.redis
         )
 
-    async def get(self, user_id: str) -> Optional[dict]:
-        return json.loads(await self.redis.get(str(user_id)))
+    async def has_token(self, user_id: str, access_token: str) -> bool:
+        stored_tokens = await ACTIVE_TOKENS(
+            keys=[sessions_key(user_id), str(user_id)],
+            client=self.redis
+        )
+        fingerprint = token_fingerprint(access_token)
+        found = False
+        # Сравниваем все значения без раннего выхода и за постоянное время
+        for stored in stored_tokens:
+            stored = stored.decode('utf-8')
+            if len(stored) != FINGERPRINT_LENGTH:
+                stored = token_fingerprint(stored)
+            found |= hmac.compare_digest(stored, fingerprint)
+        return found
+
+    async def remove_token(self, user_id: str, user_agent: str) -> None:
+        await REMOVE_TOKEN(
+            keys=[sessions_key(user_id), str(user_id)],
+            args=[user_agent],
+            client=self.redis
+        )
+
+    async def get(self, name: str) -> Optional[dict]:
+        value = await self.redis.get(str(name))
+        return json.loads(value) if value else None
 
     async def set(self, name: str, value: str, ex: timedelta = None):
         params = {
@@ -46,5 +233,25 @@ class RedisService(AsyncCacheService):
         params.update({"ex": ex}) if ex else ''
         await self.redis.set(**params)
 
+    async def get_version(self, name: str) -> int:
+        version = await self.redis.get(name)
+        if version is None:
+            # после потери ключа версия не должна повторить уже выданную
+            await self.redis.set(name, time.time_ns(), nx=True)
+            version = await self.redis.get(name)
+        return int(version)
+
+    async def bump_version(self, name: str) -> None:
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.set(name, time.time_ns(), nx=True)
+            pipe.incr(name)
+            await pipe.execute()
+
     async def delete(self, user_id: str):
-        await self.redis.delete(user_id)
+        await self.redis.delete(sessions_key(user_id), str(user_id))
+
+    async def delete_keys(self, *names: str) -> None:
+        # DEL с тысячами ключей надолго занимает Redis, удаляем пачками
+        names = list(names)
+        for start in range(0, len(names), 500):
+            await self.redis.delete(*names[start:start + 500])
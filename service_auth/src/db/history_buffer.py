@@ -0,0 +1,128 @@
+import asyncio
+import logging
+import uuid
+
+from collections import deque
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy.sql import insert
+
+from src.core.config import settings
+from src.core.metrics import HISTORY_BUFFER_ROWS, HISTORY_FLUSH_ERRORS
+from src.models.entity import AccountHistory
+from .postgres import async_session
+
+logger = logging.getLogger(__name__)
+
+FLUSHED = HISTORY_BUFFER_ROWS.labels(result='flushed')
+DROPPED = HISTORY_BUFFER_ROWS.labels(result='dropped')
+
+
+class AccountHistoryBuffer:
+    """Копит записи истории входов и пишет их в базу пачками.
+
+    Пачка уходит, когда набралось batch_size записей или прошло
+    flush_interval секунд. Если буфер заполнен до max_size, действует
+    overflow_policy: drop_oldest вытесняет самые старые записи,
+    drop_new отбрасывает новые.
+    """
+
+    def __init__(
+        self,
+        batch_size: int,
+        flush_interval: float,
+        max_size: int,
+        overflow_policy: str,
+    ) -> None:
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_size = max_size
+        self.overflow_policy = overflow_policy
+        self._rows: deque = deque()
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+    def add(self, user_id: uuid.UUID, user_agent: str) -> None:
+        if len(self._rows) >= self.max_size:
+            DROPPED.inc()
+            if self.overflow_policy == 'drop_new':
+                return
+            self._rows.popleft()
+
+        now = datetime.utcnow()
+        self._rows.append({
+            'id': uuid.uuid4(),
+            'user_id': user_id,
+            'user_agent': user_agent,
+            'created_at': now,
+            'updated_at': now,
+        })
+        if len(self._rows) >= self.batch_size:
+            self._wakeup.set()
+
+    async def flush(self) -> None:
+        while self._rows:
+            batch = [
+                self._rows.popleft()
+                for _ in range(min(self.batch_size, len(self._rows)))
+            ]
+            try:
+                async with async_session() as session:
+                    await session.execute(
+                        insert(AccountHistory).execution_options(
+                            background=True
+                        ),
+                        batch
+                    )
+                    await session.commit()
+            except Exception as err:
+                HISTORY_FLUSH_ERRORS.inc()
+                logger.error('Couldn\'t flush account history. Err - %s', err)
+                # возвращаем пачку в начало, лишнее отрежет max_size
+                free = max(self.max_size - len(self._rows), 0)
+                self._rows.extendleft(reversed(batch[:free]))
+                DROPPED.inc(len(batch) - min(free, len(batch)))
+                return
+            FLUSHED.inc(len(batch))
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(
+                    self._wakeup.wait(), timeout=self.flush_interval
+                )
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._stopping = False
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        # не отменяем задачу, чтобы не потерять пачку посреди записи
+        if self._task is not None:
+            self._stopping = True
+            self._wakeup.set()
+            await self._task
+            self._task = None
+        await self.flush()
+
+    def stats(self) -> dict:
+        return {
+            'buffered': len(self._rows),
+            'max_size': self.max_size,
+            'batch_size': self.batch_size,
+        }
+
+
+account_history_buffer = AccountHistoryBuffer(
+    batch_size=settings.HISTORY_BATCH_SIZE,
+    flush_interval=settings.HISTORY_FLUSH_INTERVAL,
+    max_size=settings.HISTORY_BUFFER_MAX_SIZE,
+    overflow_policy=settings.HISTORY_OVERFLOW_POLICY,
+)
@@ -0,0 +1,107 @@
+import logging
+import re
+
+from datetime import date
+from typing import List
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+logger = logging.getLogger(__name__)
+
+PARENT_TABLE = 'account_history'
+DEFAULT_PARTITION = f'{PARENT_TABLE}_default'
+PARTITION_NAME = re.compile(r'^account_history_y(\d{4})m(\d{2})$')
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f'{PARENT_TABLE}_y{month.year:04d}m{month.month:02d}'
+
+
+async def existing_partitions(connection: AsyncConnection) -> List[str]:
+    result = await connection.execute(text("""
+        SELECT child.relname
+        FROM pg_inherits
+        JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+        JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+        WHERE parent.relname = :parent
+    """), {'parent': PARENT_TABLE})
+    return [row[0] for row in result]
+
+
+async def create_partitions(
+    connection: AsyncConnection,
+    today: date,
+    premake_months: int
+) -> List[str]:
+    existing = set(await existing_partitions(connection))
+    created = []
+    current = today.replace(day=1)
+    for offset in range(premake_months + 1):
+        month = add_months(current, offset)
+        name = partition_name(month)
+        if name in existing:
+            continue
+        start, end = month.isoformat(), add_months(month, 1).isoformat()
+        # записи этого месяца могли уже попасть в секцию по умолчанию:
+        # переносим их в новую таблицу и только потом подключаем её
+        await connection.execute(text(
+            f'CREATE TABLE {name} (LIKE {PARENT_TABLE} INCLUDING DEFAULTS)'
+        ))
+        if DEFAULT_PARTITION in existing:
+            # до ATTACH новые записи месяца не должны попасть в секцию
+            # по умолчанию, иначе проверка ограничения при ATTACH упадёт
+            await connection.execute(text(
+                f'LOCK TABLE {DEFAULT_PARTITION} IN SHARE ROW EXCLUSIVE MODE'
+            ))
+            await connection.execute(text(f"""
+                WITH moved AS (
+                    DELETE FROM {DEFAULT_PARTITION}
+                    WHERE created_at >= '{start}' AND created_at < '{end}'
+                    RETURNING *
+                )
+                INSERT INTO {name} SELECT * FROM moved
+            """))
+        await connection.execute(text(
+            f'ALTER TABLE {PARENT_TABLE} ATTACH PARTITION {name} '
+            f"FOR VALUES FROM ('{start}') TO ('{end}')"
+        ))
+        created.append(name)
+    return created
+
+
+async def drop_expired_partitions(
+    connection: AsyncConnection,
+    today: date,
+    retention_months: int
+) -> List[str]:
+    oldest_kept = add_months(today.replace(day=1), -retention_months)
+    existing = await existing_partitions(connection)
+    dropped = []
+    for name in existing:
+        match = PARTITION_NAME.match(name)
+        if not match:
+            continue
+        month = date(int(match.group(1)), int(match.group(2)), 1)
+        if month >= oldest_kept:
+            continue
+        await connection.execute(
+            text(f'ALTER TABLE {PARENT_TABLE} DETACH PARTITION {name}')
+        )
+        await connection.execute(text(f'DROP TABLE {name}'))
+        dropped.append(name)
+    # записи старых месяцев без своей секции лежат в секции по умолчанию
+    if DEFAULT_PARTITION in existing:
+        result = await connection.execute(text(
+            f"DELETE FROM {DEFAULT_PARTITION} "
+            f"WHERE created_at < '{oldest_kept.isoformat()}'"
+        ))
+        logger.info(
+            'Deleted %s expired rows from %s', result.rowcount, DEFAULT_PARTITION
+        )
+    return dropped
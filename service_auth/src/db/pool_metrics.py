@@ -0,0 +1,60 @@
+import asyncio
+
+from typing import Optional
+
+from src.core.config import settings
+from src.core.metrics import (
+    DB_POOL_CONNECTIONS,
+    HASHING_POOL_TASKS,
+    HISTORY_BUFFER_SIZE,
+    REDIS_POOL_CONNECTIONS,
+)
+from src.utils.hashing import password_hashing
+from . import db_redis, postgres
+from .history_buffer import account_history_buffer
+
+
+class PoolMetricsSampler:
+    """Раз в interval секунд переносит состояние пулов воркера в метрики."""
+
+    def __init__(self, interval: float) -> None:
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    def sample(self) -> None:
+        db_pool = postgres.get_pool_stats()
+        for state in ('checked_out', 'checked_in'):
+            DB_POOL_CONNECTIONS.labels(state=state).set(db_pool[state])
+        # пока пул не заполнен, sqlalchemy отдаёт отрицательный overflow
+        DB_POOL_CONNECTIONS.labels(state='overflow').set(max(db_pool['overflow'], 0))
+
+        redis_pool = db_redis.get_pool_stats()
+        for state in ('in_use', 'waiting'):
+            REDIS_POOL_CONNECTIONS.labels(state=state).set(redis_pool.get(state, 0))
+
+        hashing = password_hashing.stats()
+        for state in ('pending', 'queue_depth'):
+            HASHING_POOL_TASKS.labels(state=state).set(hashing[state])
+
+        HISTORY_BUFFER_SIZE.set(account_history_buffer.stats()['buffered'])
+
+    async def _run(self) -> None:
+        while True:
+            self.sample()
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+pool_metrics = PoolMetricsSampler(interval=settings.metrics_pool_interval)
@@ -1,26 +1,96 @@
+import logging
+import time
+
+from sqlalchemy import String, event, func, literal
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from sqlalchemy.sql import select, update, insert, delete
+from sqlalchemy.sql import select, update, insert, delete, tuple_
+from sqlalchemy.sql.expression import false, true
 
-from src.models.entity import RefreshToken, Role, UserRoles
+from src.models.entity import (
+    AccountHistory, Permission, RefreshToken, Role, RolePermissions, User,
+    UserRoles
+)
 from src.core.config import settings
+from src.core.metrics import DB_CALL_DURATION, DB_STATEMENTS, observe_calls
+from src.core.tracing import trace_calls
 from .abstracts import AsyncDbService
+
+slow_query_logger = logging.getLogger('sqlalchemy.slow_query')
+
+
+def driver_connect_args(driver: str) -> dict:
+    if driver == 'asyncpg':
+        return {
+            'prepared_statement_cache_size': settings.db_statement_cache_size
+        }
+    if driver == 'psycopg':
+        # psycopg готовит запрос на сервере после prepare_threshold вызовов
+        return {'prepare_threshold': 5 if settings.db_statement_cache_size else None}
+    raise ValueError(f'Unsupported database driver: {driver}')
+
+
 # Создаём движок
 # Настройки подключения к БД передаём из переменных окружения, которые заранее загружены в файл настроек
 engine = create_async_engine(
     settings.dsl_database,
-    echo=True,
-    future=True)
+    echo=settings.db_echo,
+    future=True,
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
+    pool_timeout=settings.db_pool_timeout,
+    pool_recycle=settings.db_pool_recycle,
+    pool_pre_ping=settings.db_pool_pre_ping,
+    connect_args=driver_connect_args(settings.db_driver),
+)
 async_session = sessionmaker(
     engine, class_=AsyncSession, expire_on_commit=False
 )
 
 
+# Время старта хранится в контексте выполнения, а не на соединении:
+# если запрос упал, after_cursor_execute не вызывается и контекст просто
+# уходит вместе с ним
+@event.listens_for(engine.sync_engine, 'before_cursor_execute')
+def _start_query_timer(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context.query_start_time = time.perf_counter()
+
+
+# Фоновые записи помечают запрос execution_options(background=True)
+# и в счётчик запросов от обработчиков API не попадают
+@event.listens_for(engine.sync_engine, 'after_cursor_execute')
+def _log_slow_query(conn, cursor, statement, parameters, context, executemany):
+    if context is None or not context.execution_options.get('background'):
+        DB_STATEMENTS.inc()
+    if context is None:
+        return
+    elapsed_ms = (time.perf_counter() - context.query_start_time) * 1000
+    if elapsed_ms >= settings.db_slow_query_ms:
+        slow_query_logger.warning(
+            'slow query duration=%.2fms statement=%s', elapsed_ms, statement
+        )
+
+
+def get_pool_stats() -> dict:
+    pool = engine.pool
+    return {
+        'size': pool.size(),
+        'checked_in': pool.checkedin(),
+        'checked_out': pool.checkedout(),
+        'overflow': pool.overflow(),
+        'max_overflow': settings.db_max_overflow,
+    }
+
+
 async def get_session() -> AsyncSession:
     async with async_session() as session:
         yield session
 
 
+@trace_calls('db')
+@observe_calls(DB_CALL_DURATION)
 class DbService(AsyncDbService):
     def __init__(self, db: AsyncSession) -> None:
         self.db = db
@@ -81,6 +151,13 @@ class DbService(AsyncDbService):
         await self.db.commit()
         await self.db.refresh(data)
 
+    def add_data(self, data) -> None:
+        # Запись уйдёт в базу при ближайшем commit, без refresh после вставки
+        self.db.add(data)
+
+    async def commit(self) -> None:
+        await self.db.commit()
+
     async def simple_select(
         self,
         what_select,
@@ -104,6 +181,7 @@ class DbService(AsyncDbService):
         what_update,
         values_update: dict,
         where_update: list = None,
+        commit: bool = True,
     ):
         sql = self.__prepare_update_sql_query(
             what_update=what_update,
@@ -111,7 +189,8 @@ class DbService(AsyncDbService):
             where_update=where_update
         )
         await self.db.execute(sql)
-        await self.db.commit()
+        if commit:
+            await self.db.commit()
 
     async def update_token(
         self,
@@ -132,6 +211,18 @@ class DbService(AsyncDbService):
 
         await self.db.commit()
 
+    async def deactivate_refresh_tokens(self, user_id) -> None:
+        # условие на is_active позволяет использовать частичный индекс
+        await self.db.execute(
+            update(RefreshToken)
+            .where(
+                RefreshToken.user_id == user_id,
+                RefreshToken.is_active == true()
+            )
+            .values(is_active=false())
+        )
+        await self.db.commit()
+
     async def simple_insert(
         self,
         what_insert,
@@ -163,3 +254,70 @@ class DbService(AsyncDbService):
             join_with=UserRoles
         )
         return [role for role in user_roles]
+
+    async def get_permissions_map(self) -> dict:
+        # Все права с номерами битов и собранные маски ролей
+        permissions = await self.db.execute(
+            select(Permission.name, Permission.bit)
+        )
+        role_bits = await self.db.execute(
+            select(Role.name, Permission.bit)
+            .join(RolePermissions, RolePermissions.role_id == Role.id)
+            .join(Permission, Permission.id == RolePermissions.permission_id)
+        )
+        roles = {}
+        for role_name, bit in role_bits:
+            roles[role_name] = roles.get(role_name, 0) | (1 << bit)
+        return {'permissions': dict(permissions.all()), 'roles': roles}
+
+    async def get_account_history(
+        self,
+        user_id,
+        limit: int,
+        after: tuple = None,
+        offset: int = None,
+    ) -> list:
+        # Страница истории входов, новые первыми; after - ключ
+        # (created_at, id) последней записи предыдущей страницы
+        sql = (
+            select(
+                AccountHistory.id,
+                AccountHistory.user_agent,
+                AccountHistory.created_at
+            )
+            .where(AccountHistory.user_id == user_id)
+            .order_by(
+                AccountHistory.created_at.desc(),
+                AccountHistory.id.desc()
+            )
+            .limit(limit)
+        )
+        if after:
+            sql = sql.where(
+                tuple_(AccountHistory.created_at, AccountHistory.id)
+                < tuple_(*after)
+            )
+        elif offset:
+            sql = sql.offset(offset)
+        return (await self.db.execute(sql)).all()
+
+    async def get_user_with_roles(self, where_select: list):
+        # Пользователь и имена его ролей одним запросом
+        roles = func.coalesce(
+            func.array_agg(Role.name).filter(Role.name.isnot(None)),
+            literal([], ARRAY(String))
+        ).label('roles')
+        sql = (
+            select(
+                User.id,
+                User.email,
+                User.hash_password,
+                User.is_active,
+                roles
+            )
+            .outerjoin(UserRoles, UserRoles.user_id == User.id)
+            .outerjoin(Role, Role.id == UserRoles.role_id)
+            .where(where_select[0] == where_select[1])
+            .group_by(User.id)
+        )
+        return (await self.db.execute(sql)).first()
@@ -1,27 +1,29 @@
 import os
 import sys
 import logging
-import time
-import random
-import string
 
+from logging import config as logging_config
 
 sys.path.append(os.path.join(sys.path[0], 'src'))
 
 from contextlib import asynccontextmanager
 
 import uvicorn
-from fastapi import FastAPI, Request
+from fastapi import FastAPI
 from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
-from redis.asyncio import Redis
 
-from api.v1 import auth, roles, users
-from core.config import settings
-from core.logger import LOGGING
-from db import db_redis
+from src.api.v1 import auth, permissions, roles, users
+from src.core.config import settings
+from src.core.access_log import AccessLogMiddleware
+from src.core.logger import LOGGING, queue_logging
+from src.core.metrics import MetricsMiddleware, metrics
+from src.core.tracing import TracingMiddleware, span_exporter
+from src.db import db_redis
+from src.db.history_buffer import account_history_buffer
+from src.db.pool_metrics import pool_metrics
+from src.utils.hashing import password_hashing
 
-logging.config.fileConfig('./src/core/logging.conf', disable_existing_loggers=False)
 logger = logging.getLogger(__name__)
 
 origins = [
@@ -33,12 +35,21 @@ origins = [
 @asynccontextmanager
 async def lifespan(app: FastAPI):
 
-    db_redis.redis = Redis(
-        host=settings.redis_host,
-        port=settings.redis_port
-    )
+    # логирование настраивается один раз, при старте воркера
+    logging_config.dictConfig(LOGGING)
+    queue_logging.start()
+    span_exporter.start()
+    db_redis.redis = db_redis.create_redis()
+    account_history_buffer.start()
+    pool_metrics.start()
     yield
+    await pool_metrics.stop()
+    await account_history_buffer.stop()
     await db_redis.redis.close()
+    await db_redis.redis.connection_pool.disconnect()
+    password_hashing.shutdown()
+    span_exporter.stop()
+    queue_logging.stop()
 
 
 app = FastAPI(
@@ -59,23 +70,15 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-@app.middleware("http")
-async def log_requests(request: Request, call_next):
-    idem = ''.join(random.choices(string.ascii_uppercase + string.digits, k=6))
-    logger.info(f"rid={idem} start request path={request.url.path}")
-    logger.info(f"headers= {request.headers}")
-    start_time = time.time()
-
-    response = await call_next(request)
-
-    process_time = (time.time() - start_time) * 1000
-    formatted_process_time = '{0:.2f}'.format(process_time)
-    logger.info(f"rid={idem} completed_in={formatted_process_time}ms status_code={response.status_code}")
+app.add_middleware(TracingMiddleware)
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(AccessLogMiddleware)
 
-    return response
+app.add_route('/metrics', metrics, include_in_schema=False)
 
 app.include_router(auth.router, prefix='/api/v1/auth')
 app.include_router(roles.router, prefix='/api/v1/roles')
+app.include_router(permissions.router, prefix='/api/v1/permissions')
 app.include_router(users.router, prefix='/api/v1/users')
 
 if __name__ == '__main__':
@@ -84,6 +87,8 @@ if __name__ == '__main__':
         host=settings.app_host,
         port=settings.app_port,
         reload=True,
-        log_config=LOGGING,
+        # настраивает lifespan, см. выше
+        log_config=None,
+        access_log=False,
         log_level=logging.DEBUG,
     )
@@ -0,0 +1,53 @@
+"""Обслуживание секций истории входов, запускать по расписанию (cron).
+
+Создаёт секции на HISTORY_PREMAKE_MONTHS месяцев вперёд и удаляет
+секции старше HISTORY_RETENTION_MONTHS. Запуск из папки service_auth:
+    python -m src.maintenance
+"""
+import argparse
+import asyncio
+import logging
+
+from datetime import date
+from logging import config as logging_config
+
+from sqlalchemy import pool
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from src.core.config import settings
+from src.core.logger import LOGGING
+from src.db.partitions import create_partitions, drop_expired_partitions
+
+logger = logging.getLogger(__name__)
+
+
+async def run(premake_months: int, retention_months: int) -> None:
+    engine = create_async_engine(settings.dsl_database, poolclass=pool.NullPool)
+    try:
+        async with engine.begin() as connection:
+            today = date.today()
+            created = await create_partitions(connection, today, premake_months)
+            dropped = await drop_expired_partitions(
+                connection, today, retention_months
+            )
+    finally:
+        await engine.dispose()
+    logger.info('Created partitions: %s', ', '.join(created) or '-')
+    logger.info('Dropped partitions: %s', ', '.join(dropped) or '-')
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        '--premake-months', type=int, default=settings.HISTORY_PREMAKE_MONTHS
+    )
+    parser.add_argument(
+        '--retention-months', type=int, default=settings.HISTORY_RETENTION_MONTHS
+    )
+    args = parser.parse_args()
+    logging_config.dictConfig(LOGGING)
+    asyncio.run(run(args.premake_months, args.retention_months))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""Применение миграций отдельной командой, а не при старте приложения.
+
+Запуск из папки service_auth:
+    python -m src.migrate          # upgrade head, если база отстаёт
+    python -m src.migrate --check  # код 1, если база не на head
+"""
+import argparse
+import asyncio
+import logging
+
+from logging import config as logging_config
+import sys
+
+from alembic import command
+from alembic.config import Config
+from alembic.script import ScriptDirectory
+from sqlalchemy import pool, text
+from sqlalchemy.exc import ProgrammingError
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from src.core.config import settings
+from src.core.logger import LOGGING
+
+logger = logging.getLogger(__name__)
+
+
+async def current_revisions() -> set:
+    # Читаем только alembic_version, схему не рефлектим
+    engine = create_async_engine(settings.dsl_database, poolclass=pool.NullPool)
+    try:
+        async with engine.connect() as connection:
+            result = await connection.execute(
+                text('SELECT version_num FROM alembic_version')
+            )
+            return {row[0] for row in result}
+    except ProgrammingError:
+        return set()
+    finally:
+        await engine.dispose()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--check', action='store_true')
+    parser.add_argument('--config', default='alembic.ini')
+    args = parser.parse_args()
+    logging_config.dictConfig(LOGGING)
+
+    config = Config(args.config)
+    heads = set(ScriptDirectory.from_config(config).get_heads())
+    current = asyncio.run(current_revisions())
+    if current == heads:
+        logger.info('Database is already at head %s', ', '.join(sorted(heads)))
+        return 0
+    if args.check:
+        logger.warning('Database is at %s, head is %s', current, heads)
+        return 1
+
+    command.upgrade(config, 'head')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -2,10 +2,14 @@ import uuid
 from datetime import datetime
 
 
-from sqlalchemy import Boolean, Column, DateTime, ForeignKey, String
+from sqlalchemy import (
+    Boolean, Column, DateTime, ForeignKey, Index, Integer, Sequence, String,
+    UniqueConstraint, text
+)
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import declarative_base
-from werkzeug.security import generate_password_hash
+
+from src.utils.hashers import hash_password as make_password_hash
 
 Base = declarative_base()
 
@@ -38,13 +42,15 @@ class User(Base, BaseMixin):
             first_name: str,
             last_name: str,
             email: str,
-            password: str
+            password: str = None,
+            hash_password: str = None
     ) -> None:
 
         self.first_name = first_name
         self.last_name = last_name
         self.email = email
-        self.hash_password = generate_password_hash(password)
+        # hash_password передаётся, когда хэш посчитан заранее вне event loop
+        self.hash_password = hash_password or make_password_hash(password)
 
     def __repr__(self) -> str:
         return f'<User {self.email}>'
@@ -52,6 +58,9 @@ class User(Base, BaseMixin):
 
 class UserRoles(Base, BaseMixin):
     __tablename__ = 'usersroles'
+    __table_args__ = (
+        UniqueConstraint('user_id', 'role_id', name='uq_usersroles_user_role'),
+    )
 
     user_id = Column(UUID(as_uuid=True), ForeignKey('users.id', ondelete='CASCADE'))
     role_id = Column(UUID(as_uuid=True), ForeignKey('roles.id', ondelete='CASCADE'))
@@ -71,8 +80,65 @@ class Role(Base, BaseMixin):
         return f'<Role {self.name}>'
 
 
+PERMISSION_BIT_SEQ = Sequence('permissions_bit_seq', start=0, minvalue=0)
+
+
+class Permission(Base, BaseMixin):
+    __tablename__ = 'permissions'
+
+    name = Column(String(50), unique=True, nullable=False)
+    description = Column(String(255), nullable=False)
+    # номер бита права в битовой маске роли, выдаёт последовательность в базе
+    bit = Column(
+        Integer,
+        PERMISSION_BIT_SEQ,
+        server_default=PERMISSION_BIT_SEQ.next_value(),
+        unique=True,
+        nullable=False
+    )
+
+    def __init__(self, name: str, description: str) -> None:
+        self.name = name
+        self.description = description
+
+    def __repr__(self) -> str:
+        return f'<Permission {self.name}>'
+
+
+class RolePermissions(Base, BaseMixin):
+    __tablename__ = 'rolespermissions'
+    __table_args__ = (
+        UniqueConstraint(
+            'role_id', 'permission_id', name='uq_rolespermissions_role_permission'
+        ),
+    )
+
+    role_id = Column(UUID(as_uuid=True), ForeignKey('roles.id', ondelete='CASCADE'))
+    permission_id = Column(
+        UUID(as_uuid=True), ForeignKey('permissions.id', ondelete='CASCADE')
+    )
+
+
 class AccountHistory(Base, BaseMixin):
     __tablename__ = 'account_history'
+    # Таблица секционирована по месяцам, поэтому created_at входит в ключ
+    __table_args__ = (
+        Index('ix_account_history_user_created', 'user_id', text('created_at DESC')),
+        {'postgresql_partition_by': 'RANGE (created_at)'},
+    )
+
+    id = Column(
+        UUID(as_uuid=True),
+        primary_key=True,
+        default=uuid.uuid4,
+        nullable=False
+    )
+    created_at = Column(
+        DateTime,
+        primary_key=True,
+        default=datetime.utcnow,
+        nullable=False
+    )
 
     user_id = Column(UUID(as_uuid=True), ForeignKey('users.id', ondelete='CASCADE'))
     user_agent = Column(String(255), nullable=False, server_default='default UA')  # здесь потом должна быть функция получающая useragent
@@ -80,6 +146,15 @@ class AccountHistory(Base, BaseMixin):
 
 class RefreshToken(Base, BaseMixin):
     __tablename__ = 'refresh_tokens'
+    __table_args__ = (
+        Index('ix_refresh_tokens_user_token', 'user_token', postgresql_using='hash'),
+        Index(
+            'ix_refresh_tokens_active_user_agent',
+            'user_id',
+            'user_agent',
+            postgresql_where=text('is_active')
+        ),
+    )
 
     user_id = Column(UUID(as_uuid=True), ForeignKey('users.id', ondelete='CASCADE'))
     user_token = Column(String(600), nullable=False, server_default='default UT')  # здесь потом должна быть функция получающая user_token
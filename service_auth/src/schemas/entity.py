@@ -1,6 +1,8 @@
 import re
 
 from uuid import UUID
+from typing import List
+
 from pydantic import BaseModel, EmailStr, validator, Field
 from pydantic.class_validators import root_validator
 from datetime import datetime
@@ -145,3 +147,34 @@ class RefreshToken(BaseModel):
 
     class Config:
         orm_mode = True
+
+
+class Permissions(BaseModel):
+    name: str
+    description: str
+
+    class Config:
+        orm_mode = True
+
+
+class PermissionCheck(BaseModel):
+    permission: str
+    allowed: bool
+
+    class Config:
+        orm_mode = True
+
+
+class PermissionsBatchCheck(BaseModel):
+    # метки доступа элементов списка, например фильмов на странице
+    labels: List[str] = Field(..., max_items=1000)
+
+    class Config:
+        orm_mode = True
+
+
+class PermissionsBatchResult(BaseModel):
+    allowed: List[bool]
+
+    class Config:
+        orm_mode = True
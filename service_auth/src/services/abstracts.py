@@ -2,9 +2,11 @@ import abc
 import uuid
 
 from fastapi import Response
-from typing import Optional, List
+from typing import Optional, List, Tuple
 
-from src.schemas.entity import UserInDB, Tokens, Status, Roles, ShemaAccountHistory
+from src.schemas.entity import (
+    UserInDB, Tokens, Status, Roles, ShemaAccountHistory, Permissions
+)
 
 
 class AsyncAuthService(abc.ABC):
@@ -61,7 +63,10 @@ class AsyncRolesService(abc.ABC):
         pass
 
     @abc.abstractmethod
-    async def get_roles(self) -> List[Roles]:
+    async def get_roles(
+        self,
+        if_none_match: Optional[str] = None
+    ) -> Optional[Tuple[str, Optional[List[dict]]]]:
         pass
 
     @abc.abstractmethod
@@ -81,13 +86,63 @@ class AsyncRolesService(abc.ABC):
         pass
 
 
+class AsyncPermissionsService(abc.ABC):
+
+    @abc.abstractmethod
+    async def create_permission(
+        self,
+        name: str,
+        description: str
+    ) -> Optional[Permissions]:
+        pass
+
+    @abc.abstractmethod
+    async def get_permissions(self) -> List[Permissions]:
+        pass
+
+    @abc.abstractmethod
+    async def set_permission_to_role(
+        self,
+        role_name: str,
+        permission_name: str,
+    ) -> Optional[Status]:
+        pass
+
+    @abc.abstractmethod
+    async def delete_permission_from_role(
+        self,
+        role_name: str,
+        permission_name: str,
+    ) -> Optional[Status]:
+        pass
+
+    @abc.abstractmethod
+    async def check_permission(
+        self,
+        user_id: str,
+        permission: str
+    ) -> Optional[bool]:
+        pass
+
+    @abc.abstractmethod
+    async def check_permissions(
+        self,
+        user_id: str,
+        labels: List[str]
+    ) -> Optional[List[bool]]:
+        pass
+
+
 class AsyncUsersService(abc.ABC):
 
     @abc.abstractmethod
     async def get_account_history(
         self,
-        user_id: uuid
-    ) -> Optional[List[ShemaAccountHistory]]:
+        user_id: uuid,
+        page_size: int,
+        cursor: Optional[str] = None,
+        page: Optional[int] = None,
+    ) -> Optional[Tuple[List[ShemaAccountHistory], Optional[str]]]:
         pass
 
     @abc.abstractclassmethod
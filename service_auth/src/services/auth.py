@@ -1,4 +1,3 @@
-import json
 import logging
 
 from functools import lru_cache
@@ -9,23 +8,26 @@ from fastapi.encoders import jsonable_encoder
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.sql.expression import true, false
 from redis.asyncio import Redis
-from werkzeug.security import check_password_hash
 from datetime import timedelta
 
 from src.db.postgres import get_session, DbService
 from src.db.db_redis import get_redis, RedisService
+from src.db.history_buffer import account_history_buffer
 from src.schemas.entity import Status, UserInDB, Tokens
 from src.models.entity import (
-    Role, User, UserRoles, RefreshToken, AccountHistory
+    Role, User, UserRoles, RefreshToken
 )
 from src.core.config import settings
-from core.oauth2 import AuthJWT
+from src.utils.hashing import HashingPoolBusy, password_hashing
+from src.utils.token_cache import access_token_cache
+from src.core.oauth2 import AuthJWT, decode_token
+from src.core.tracing import trace_calls
 from .abstracts import AsyncAuthService
 
-logging.config.fileConfig('./src/core/logging.conf', disable_existing_loggers=False)
 logger = logging.getLogger(__name__)
 
 
+@trace_calls('auth')
 class AuthService(AsyncAuthService):
     def __init__(
         self,
@@ -44,11 +46,10 @@ class AuthService(AsyncAuthService):
         user_claims: dict = {},
     ) -> Tokens:
 
-        logger.info(f"""Start to create tokens. Params:
-        subject - {subject},
-        is_ex - {is_ex},
-        user_claims - {user_claims}
-        """)
+        logger.info(
+            "Start to create tokens. Params: subject - %s, is_ex - %s, user_claims - %s",
+            subject, is_ex, user_claims
+        )
         params_for_access = {
             'subject': subject,
             'user_claims': user_claims
@@ -104,30 +105,35 @@ class AuthService(AsyncAuthService):
         by: str,
         data: str
     ) -> Optional[HTTPStatus]:
-        logger.info(f"""Start to check user exist.
-        Params: by - {by}, data - {data}""")
+        logger.info("Start to check user exist. Params: by - %s, data - %s", by, data)
         where_list = []
         if by == 'email':
             where_list = [User.email, data]
         else:
             where_list = [User.id, data]
-        existing_user = await self.db_service.simple_select(
-            what_select=User,
+        # вместе с пользователем сразу получаем его роли
+        existing_user = await self.db_service.get_user_with_roles(
             where_select=where_list
         )
-        if len(existing_user) == 0:
+        if existing_user is None:
             return HTTPStatus.CONFLICT
-        if not existing_user[0].is_active:
+        if not existing_user.is_active:
             return HTTPStatus.BAD_REQUEST
 
         logger.info(msg="Finish to check user exist")
-        return existing_user[0]
+        return existing_user
 
     async def create_user(self, user_info: UserInDB) -> Optional[UserInDB]:
-            logger.info(f'Start to create user. Params: user_info - {user_info}')
+            logger.info("Start to create user. Params: email - %s", user_info.email)
         # try:
             user_dto = jsonable_encoder(user_info)
-            user_dto['password'] = settings.SAULT + user_dto['email'] + user_dto['password']
+            try:
+                user_dto['hash_password'] = await password_hashing.hash(
+                    settings.SAULT + user_dto['email'] + user_dto.pop('password')
+                )
+            except HashingPoolBusy:
+                logger.info(msg="Couldn't create user because hashing pool is busy")
+                return HTTPStatus.SERVICE_UNAVAILABLE
             user = User(**user_dto)
 
             roles = await self.db_service.simple_select(
@@ -174,12 +180,10 @@ class AuthService(AsyncAuthService):
         response: Response
     ) -> Tokens:
         try:
-            logger.info(f"""Start User login. Params:
-            user_agent - {user_agent},
-            email - {email},
-            set_cookie - {set_cookie},
-            response - {response}
-            """)
+            logger.info(
+                "Start User login. Params: user_agent - %s, email - %s, set_cookie - %s",
+                user_agent, email, set_cookie
+            )
             existing_user = await self.__check_user_exist_active(
                 by='email',
                 data=email
@@ -188,25 +192,30 @@ class AuthService(AsyncAuthService):
                 logger.info(msg="User didn't go a checking")
                 return existing_user
 
-            password_match = check_password_hash(
-                pwhash=existing_user.hash_password,
-                password=settings.SAULT + existing_user.email + passwd
+            password_match, new_hash = await password_hashing.verify_and_update(
+                existing_user.hash_password,
+                settings.SAULT + existing_user.email + passwd
             )
 
             if not password_match:
                 logger.info(msg="Password didn't match")
                 return HTTPStatus.UNAUTHORIZED
 
-            user_roles = await self.db_service.get_user_roles(
-                user_id=existing_user.id
-            )
+            # хэш устарел: сохранится вместе с refresh токеном одним коммитом
+            if new_hash:
+                await self.db_service.simple_update(
+                    what_update=User,
+                    where_update=[User.id, existing_user.id],
+                    values_update={'hash_password': new_hash},
+                    commit=False
+                )
 
             # create access and refresh tokens
             tokens = await self.__create_tokens(
                 subject=str(existing_user.id),
                 is_ex=True,
                 user_claims={
-                    "roles": user_roles,
+                    "roles": list(existing_user.roles),
                     "email": existing_user.email
                 }
             )
@@ -217,25 +226,28 @@ class AuthService(AsyncAuthService):
                 access_token=tokens.access_token,
                 user_agent=user_agent
             )
-            # save refresh token
-            data_refresh_token = RefreshToken(
+            # save refresh token; вместе с новым хэшем пароля это
+            # единственная запись входа, она уходит одним коммитом
+            self.db_service.add_data(RefreshToken(
                 user_id=existing_user.id,
                 user_token=tokens.refresh_token,
                 is_active=true(),
                 user_agent=user_agent
-            )
-            await self.db_service.insert_data(data_refresh_token)
-            # add data to account history
-            data_header = AccountHistory(
+            ))
+            await self.db_service.commit()
+            # add data to account history, запишется в базу пачкой позже
+            account_history_buffer.add(
                 user_id=existing_user.id,
                 user_agent=user_agent
             )
-            await self.db_service.insert_data(data_header)
             # set cookie
             if set_cookie:
                 response.set_cookie('access_token', tokens.access_token, settings.ACCESS_TOKEN_EXPIRES_IN, settings.ACCESS_TOKEN_EXPIRES_IN, '/', None, False, True, 'lax')
                 response.set_cookie('refresh_token', tokens.refresh_token, settings.REFRESH_TOKEN_EXPIRES_IN, settings.REFRESH_TOKEN_EXPIRES_IN, '/', None, False, True, 'lax')
             logger.info(msg="Finish User login")
+        except HashingPoolBusy:
+            logger.warning(msg="User can't login. Hashing pool is busy")
+            return HTTPStatus.SERVICE_UNAVAILABLE
         except Exception as err:
             logger.error(msg=f"User can't login. Err - {err}")
             return None
@@ -245,14 +257,9 @@ class AuthService(AsyncAuthService):
         # check token
         try:
             logger.info(msg="Start to refresh tokens")
-            await self.Authorize._verify_jwt_in_request(
-                token=refresh_token,
-                type_token='refresh',
-                token_from='headers'
-            )
+            data_token = decode_token(refresh_token, token_type='refresh')
 
             # check user
-            data_token = await self.Authorize.get_raw_jwt(refresh_token)
             sub = data_token.get('sub')
             existing_user = await self.__check_user_exist_active(
                 by='user',
@@ -262,14 +269,11 @@ class AuthService(AsyncAuthService):
                 return existing_user
 
             # create access and refresh tokens
-            user_roles = await self.db_service.get_user_roles(
-                user_id=existing_user.id
-            )
             tokens = await self.__create_tokens(
                 subject=str(existing_user.id),
                 is_ex=True,
                 user_claims={
-                    "roles": user_roles,
+                    "roles": list(existing_user.roles),
                     "email": existing_user.email
                 }
             )
@@ -285,15 +289,16 @@ class AuthService(AsyncAuthService):
             await self.db_service.simple_update(
                 what_update=RefreshToken,
                 where_update=[RefreshToken.user_token, refresh_token],
-                values_update={'is_active': false()}
+                values_update={'is_active': false()},
+                commit=False
             )
-            # save a refresh token
-            data_refresh_token = RefreshToken(
+            # save a refresh token в той же транзакции
+            self.db_service.add_data(RefreshToken(
                 user_id=existing_user.id,
                 user_token=tokens.refresh_token,
                 is_active=True
-            )
-            await self.db_service.insert_data(data_refresh_token)
+            ))
+            await self.db_service.commit()
             logger.info(msg="Finish to refresh tokens")
         except Exception as err:
             logger.error(msg=f"Couldn't refresh tokens. Err - {err}")
@@ -302,13 +307,10 @@ class AuthService(AsyncAuthService):
 
     async def logout_all(self, user_id: str) -> Status:
         try:
-            logger.info(f"Start to logout all. Params: user_id - {user_id}")
+            logger.info("Start to logout all. Params: user_id - %s", user_id)
             await self.redis_service.delete(user_id)
-            await self.db_service.simple_update(
-                what_update=RefreshToken,
-                where_update=[RefreshToken.user_id, user_id],
-                values_update={'is_active': false()}
-            )
+            access_token_cache.invalidate_user(user_id)
+            await self.db_service.deactivate_refresh_tokens(user_id)
             logger.info(msg="Finish to logout all")
         except Exception as err:
             logger.error(msg=f"Couldn't logout all. Err - {err}")
@@ -317,20 +319,15 @@ class AuthService(AsyncAuthService):
 
     async def logout_me(self, user_id: str, user_agent: str) -> Status:
         try:
-            logger.info(f"""Start to logout me. Params:
-            user_id - {user_id},
-            user_agent - {user_agent}
-            """)
-            current_user_tokens = await self.redis_service.get(user_id)
-            current_user_tokens.pop(user_agent)
-
-            if len(current_user_tokens) == 0:
-                await self.redis_service.delete(user_id)
-            else:
-                await self.redis_service.set(
-                    name=user_id,
-                    value=json.dumps(current_user_tokens),
-                )
+            logger.info(
+                "Start to logout me. Params: user_id - %s, user_agent - %s",
+                user_id, user_agent
+            )
+            await self.redis_service.remove_token(
+                user_id=user_id,
+                user_agent=user_agent
+            )
+            access_token_cache.invalidate_user(user_id)
 
             await self.db_service.update_token(
                 what_update=RefreshToken,
@@ -0,0 +1,214 @@
+import logging
+
+from http import HTTPStatus
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+from fastapi import Depends
+from redis.asyncio import Redis
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import select, delete
+
+from src.db.postgres import get_session, DbService
+from src.db.db_redis import get_redis, RedisService
+from src.schemas.entity import Permissions, Status
+from src.models.entity import Permission, Role, RolePermissions
+from src.utils.permissions_cache import permissions_cache
+from src.utils.roles_cache import user_roles_cache
+from src.core.tracing import trace_calls
+from .abstracts import AsyncPermissionsService
+
+logger = logging.getLogger(__name__)
+
+
+@trace_calls('permissions')
+class PermissionsService(AsyncPermissionsService):
+    def __init__(
+        self,
+        db_service: DbService,
+        redis_service: RedisService
+    ) -> None:
+        self.db_service = db_service
+        self.redis_service = redis_service
+
+    async def _get_by_name(self, model, name: str):
+        exist = await self.db_service.simple_select(
+            what_select=model,
+            where_select=[model.name, name]
+        )
+        if len(exist) > 0:
+            return exist[0]
+        return False
+
+    async def create_permission(
+        self,
+        name: str,
+        description: str
+    ) -> Optional[Permissions]:
+        try:
+            logger.info(
+                "Start to create permission. Params: name - %s, description - %s",
+                name, description
+            )
+            if await self._get_by_name(Permission, name):
+                return HTTPStatus.BAD_REQUEST
+
+            # бит выдаёт последовательность permissions_bit_seq при вставке
+            self.db_service.add_data(
+                Permission(name=name, description=description)
+            )
+            await self.db_service.commit()
+            await permissions_cache.invalidate(self.redis_service)
+            logger.info("Finish to create permission")
+        except Exception as err:
+            logger.error("Couldn't create permission. Err - %s", err)
+            return None
+        return Permissions(name=name, description=description)
+
+    async def get_permissions(self) -> List[Permissions]:
+        try:
+            logger.info("Start to get permissions")
+            datas = await self.db_service.simple_select(
+                what_select=Permission,
+                order_select=Permission.bit.asc
+            )
+            logger.info("Finish to get permissions")
+            return [
+                Permissions(name=data.name, description=data.description)
+                for data in datas
+            ]
+        except Exception as err:
+            logger.error("Couldn't to get permissions. Err - %s", err)
+            return None
+
+    async def set_permission_to_role(
+        self,
+        role_name: str,
+        permission_name: str,
+    ) -> Optional[Status]:
+        try:
+            logger.info(
+                "Start to set a permission for role. Params: role_name - %s, permission_name - %s",
+                role_name, permission_name
+            )
+            role_exist = await self._get_by_name(Role, role_name)
+            if not role_exist:
+                return HTTPStatus.BAD_REQUEST
+            permission_exist = await self._get_by_name(Permission, permission_name)
+            if not permission_exist:
+                return HTTPStatus.CONFLICT
+
+            role_permission = await self.db_service.db.execute(
+                select(RolePermissions)
+                .where(
+                    RolePermissions.role_id == role_exist.id,
+                    RolePermissions.permission_id == permission_exist.id
+                )
+            )
+            if not role_permission.scalar():
+                self.db_service.add_data(
+                    RolePermissions(
+                        role_id=role_exist.id,
+                        permission_id=permission_exist.id
+                    )
+                )
+                await self.db_service.commit()
+                await permissions_cache.invalidate(self.redis_service)
+            logger.info("Finish to set a permission for role")
+            return Status(status='success')
+        except Exception as err:
+            logger.error("Couldn't to set a permission for role. Err - %s", err)
+            return None
+
+    async def delete_permission_from_role(
+        self,
+        role_name: str,
+        permission_name: str,
+    ) -> Optional[Status]:
+        try:
+            logger.info(
+                "Start to delete a permission for role. "
+                "Params: role_name - %s, permission_name - %s",
+                role_name, permission_name
+            )
+            role_exist = await self._get_by_name(Role, role_name)
+            if not role_exist:
+                return HTTPStatus.BAD_REQUEST
+            permission_exist = await self._get_by_name(Permission, permission_name)
+            if not permission_exist:
+                return HTTPStatus.CONFLICT
+
+            await self.db_service.db.execute(
+                delete(RolePermissions)
+                .where(
+                    RolePermissions.role_id == role_exist.id,
+                    RolePermissions.permission_id == permission_exist.id
+                )
+            )
+            await self.db_service.db.commit()
+            await permissions_cache.invalidate(self.redis_service)
+            logger.info("Finish to delete a permission for role")
+            return Status(status='success')
+        except Exception as err:
+            logger.error("Couldn't to delete a permission for role. Err - %s", err)
+            return None
+
+    async def _get_user_mask(self, user_id: str) -> Tuple[dict, int]:
+        # только кэши: роли пользователя и карта прав, postgres при промахе
+        permissions_map = await permissions_cache.get_map(
+            self.redis_service,
+            loader=self.db_service.get_permissions_map
+        )
+        roles = await user_roles_cache.get(
+            self.redis_service,
+            user_id,
+            loader=lambda: self.db_service.get_user_roles(user_id=user_id)
+        )
+        return permissions_map, permissions_cache.user_mask(permissions_map, roles)
+
+    async def check_permission(
+        self,
+        user_id: str,
+        permission: str
+    ) -> Optional[bool]:
+        try:
+            permissions_map, mask = await self._get_user_mask(user_id)
+            allowed = permissions_cache.has_permission(
+                permissions_map, mask, permission
+            )
+            if allowed is None:
+                return HTTPStatus.BAD_REQUEST
+            return allowed
+        except Exception as err:
+            logger.error("Couldn't to check permission. Err - %s", err)
+            return None
+
+    async def check_permissions(
+        self,
+        user_id: str,
+        labels: List[str]
+    ) -> Optional[List[bool]]:
+        # неизвестная метка просто запрещает доступ к своему элементу
+        try:
+            permissions_map, mask = await self._get_user_mask(user_id)
+            allowed = {
+                label: bool(
+                    permissions_cache.has_permission(permissions_map, mask, label)
+                )
+                for label in set(labels)
+            }
+            return [allowed[label] for label in labels]
+        except Exception as err:
+            logger.error("Couldn't to check permissions. Err - %s", err)
+            return None
+
+
+@lru_cache()
+def permission_services(
+    db: AsyncSession = Depends(get_session),
+    redis: Redis = Depends(get_redis),
+) -> PermissionsService:
+    return PermissionsService(
+        db_service=DbService(db=db),
+        redis_service=RedisService(redis=redis)
+    )
@@ -1,25 +1,66 @@
+import json
 import logging
 
+from datetime import timedelta
 from http import HTTPStatus
 from functools import lru_cache
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
 from fastapi import Depends
+from redis.asyncio import Redis
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.sql import select, delete
 
 from src.db.postgres import get_session, DbService
+from src.core.config import settings
+from src.db.db_redis import get_redis, RedisService
 from src.schemas.entity import Roles, Status
 from src.models.entity import Role, User, UserRoles
+from src.utils.permissions_cache import permissions_cache
+from src.utils.roles_cache import user_roles_cache
+from src.core.tracing import trace_calls
 from .abstracts import AsyncRolesService
 
-logging.config.fileConfig('./src/core/logging.conf', disable_existing_loggers=False)
 logger = logging.getLogger(__name__)
 
+ROLES_VERSION_KEY = 'roles_catalogue:version'
 
+
+def roles_catalogue_key(version: int) -> str:
+    return f'roles_catalogue:{version}'
+
+
+def roles_etag(version: int) -> str:
+    return f'"roles-{version}"'
+
+
+def etag_matches(etag: str, if_none_match: Optional[str]) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    tags = [tag.strip() for tag in if_none_match.split(',')]
+    # слабое сравнение, как требует If-None-Match
+    return etag in [tag[2:] if tag.startswith('W/') else tag for tag in tags]
+
+
+@trace_calls('roles')
 class RolesService(AsyncRolesService):
-    def __init__(self, db_service: DbService) -> None:
+    def __init__(
+        self,
+        db_service: DbService,
+        redis_service: RedisService
+    ) -> None:
         self.db_service = db_service
+        self.redis_service = redis_service
+
+    async def _get_role_members(self, name: str) -> list:
+        # владельцев роли собираем до изменения: после удаления связей уже нет
+        return await self.db_service.simple_select(
+            what_select=UserRoles.user_id,
+            where_select=[Role.name, name],
+            join_with=Role
+        )
 
     async def _check_role_by_name(self, name: str) -> bool:
         logger.info("Start to check role by name")
@@ -49,10 +90,10 @@ class RolesService(AsyncRolesService):
         description: str
     ) -> Optional[Roles]:
         try:
-            logger.info(f"""Start to create role.Params:
-            name - {name}
-            description - {description}
-            """)
+            logger.info(
+                "Start to create role. Params: name - %s, description - %s",
+                name, description
+            )
             role_exist = await self._check_role_by_name(name=name)
             if role_exist:
                 return HTTPStatus.BAD_REQUEST
@@ -64,9 +105,10 @@ class RolesService(AsyncRolesService):
                     "description": description
                 }
             )
+            await self.redis_service.bump_version(ROLES_VERSION_KEY)
             logger.info("Finish to create role")
         except Exception as err:
-            logger.error(f"Couldn't create role. Err - {err}")
+            logger.error("Couldn't create role. Err - %s", err)
             return None
         return Roles(name=name, description=description)
 
@@ -77,56 +119,86 @@ class RolesService(AsyncRolesService):
         new_name: str,
     ) -> Optional[Status]:
         try:
-            logger.info(f"""Start to change role. Params:
-            name - {name},
-            new_description - {new_description},
-            new_name - {new_name}
-            """)
+            logger.info(
+                "Start to change role. Params: name - %s, new_description - %s, new_name - %s",
+                name, new_description, new_name
+            )
             role_exist = await self._check_role_by_name(name=name)
             if not role_exist:
                 return HTTPStatus.BAD_REQUEST
 
             values = {"description": new_description}
             values.update({'name': new_name}) if new_name else ''
+            renamed = new_name and new_name != name
+            user_ids = await self._get_role_members(name) if renamed else []
             await self.db_service.simple_update(
                 what_update=Role,
                 where_update=[Role.name, name],
                 values_update=values
             )
+            if renamed:
+                # кэш сбрасываем после коммита, иначе параллельный запрос
+                # успеет положить в него старое имя роли
+                if user_ids:
+                    await user_roles_cache.invalidate(self.redis_service, *user_ids)
+                # маски прав в карте хранятся по имени роли
+                await permissions_cache.invalidate(self.redis_service)
+            await self.redis_service.bump_version(ROLES_VERSION_KEY)
             logger.info("Finish to change role")
         except Exception as err:
-            logger.error(f"Couldn't to change role. Err - {err}")
+            logger.error("Couldn't to change role. Err - %s", err)
             return None
         return Status(status='success')
 
-    async def get_roles(self) -> List[Roles]:
+    async def get_roles(
+        self,
+        if_none_match: Optional[str] = None
+    ) -> Optional[Tuple[str, Optional[List[dict]]]]:
+        # (etag, роли); роли None, если у клиента актуальная версия
         try:
             logger.info("Start to get roles")
-            datas = await self.db_service.simple_select(Role)
+            version = await self.redis_service.get_version(ROLES_VERSION_KEY)
+            etag = roles_etag(version)
+            if etag_matches(etag, if_none_match):
+                return etag, None
+
+            roles = await self.redis_service.get(roles_catalogue_key(version))
+            if roles is None:
+                datas = await self.db_service.simple_select(Role)
+                roles = [
+                    Roles(name=data.name, description=data.description).dict()
+                    for data in datas
+                ]
+                await self.redis_service.set(
+                    name=roles_catalogue_key(version),
+                    value=json.dumps(roles),
+                    ex=timedelta(seconds=settings.ROLES_CATALOGUE_CACHE_TTL)
+                )
             logger.info("Finish to get roles")
-            return [
-                Roles(name=data.name, description=data.description)
-                for data in datas
-            ]
+            return etag, roles
         except Exception as err:
-            logger.error(f"Couldn't to get roles. Err - {err}")
+            logger.error("Couldn't to get roles. Err - %s", err)
             return None
 
     async def delete_role(self, name: str) -> Optional[Status]:
         try:
-            logger.info(f"""Start to delete role. Params:
-            name - {name}""")
+            logger.info("Start to delete role. Params: name - %s", name)
             role_exist = await self._check_role_by_name(name=name)
             if not role_exist:
                 return HTTPStatus.BAD_REQUEST
+            user_ids = await self._get_role_members(name)
             await self.db_service.simple_delete(
                 what_delete=Role,
                 where_delete=[Role.name, name]
             )
+            if user_ids:
+                await user_roles_cache.invalidate(self.redis_service, *user_ids)
+            await permissions_cache.invalidate(self.redis_service)
+            await self.redis_service.bump_version(ROLES_VERSION_KEY)
             logger.info("Finish to delete role")
             return Status(status='success')
         except Exception as err:
-            logger.error(f"Couldn't to delete role. Err - {err}")
+            logger.error("Couldn't to delete role. Err - %s", err)
             return None
 
     async def set_role_to_user(
@@ -135,10 +207,10 @@ class RolesService(AsyncRolesService):
         role_name: str,
     ) -> Optional[Roles]:
         try:
-            logger.info(f"""Start to set a role for user. Params
-            email - {email}
-            role_name - {role_name}
-            """)
+            logger.info(
+                "Start to set a role for user. Params: email - %s, role_name - %s",
+                email, role_name
+            )
             role_exist = await self._check_role_by_name(name=role_name)
             if not role_exist:
                 return HTTPStatus.BAD_REQUEST
@@ -170,6 +242,9 @@ class RolesService(AsyncRolesService):
             )
 
             await self.db_service.insert_data(data_insert)
+            await user_roles_cache.invalidate(
+                self.redis_service, existing_user.id
+            )
             user_roles = await self.db_service.simple_select(
                 what_select=Role,
                 where_select=[UserRoles.user_id, existing_user.id],
@@ -181,7 +256,7 @@ class RolesService(AsyncRolesService):
                 for role in user_roles
             ]
         except Exception as err:
-            logger.error(f"Couldn't to set a role for user. Err - {err}")
+            logger.error("Couldn't to set a role for user. Err - %s", err)
             return None
 
     async def delete_role_to_user(
@@ -190,10 +265,10 @@ class RolesService(AsyncRolesService):
         role_name: str,
     ) -> Optional[Status]:
         try:
-            logger.info(f"""Start to delete a role for user. Params:
-            email - {email}
-            role_name - {role_name}
-            """)
+            logger.info(
+                "Start to delete a role for user. Params: email - %s, role_name - %s",
+                email, role_name
+            )
             role_exist = await self._check_role_by_name(name=role_name)
             if not role_exist:
                 return HTTPStatus.BAD_REQUEST
@@ -209,17 +284,22 @@ class RolesService(AsyncRolesService):
                 )
             )
             await self.db_service.db.commit()
+            await user_roles_cache.invalidate(
+                self.redis_service, existing_user.id
+            )
             logger.info("Finish to delete a role for user")
             return Status(status='success')
         except Exception as err:
-            logger.error(f"Couldn't to delete a role for user. Err - {err}")
+            logger.error("Couldn't to delete a role for user. Err - %s", err)
             return None
 
 
 @lru_cache()
 def role_services(
     db: AsyncSession = Depends(get_session),
+    redis: Redis = Depends(get_redis),
 ) -> RolesService:
     return RolesService(
-        db_service=DbService(db=db)
+        db_service=DbService(db=db),
+        redis_service=RedisService(redis=redis)
     )
@@ -1,50 +1,93 @@
+import base64
 import uuid
 import logging
 
+from datetime import datetime
 from functools import lru_cache
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from http import HTTPStatus
 
 from fastapi import Depends
+from redis.asyncio import Redis
 from sqlalchemy.ext.asyncio import AsyncSession
-from werkzeug.security import check_password_hash, generate_password_hash
 
 from src.db.postgres import get_session, DbService
+from src.db.db_redis import get_redis, RedisService
 from src.schemas.entity import ShemaAccountHistory, Status, UserInDB
-from src.models.entity import AccountHistory, User
+from src.models.entity import User
 from src.core.config import settings
+from src.utils.hashing import HashingPoolBusy, password_hashing
+from src.utils.token_cache import access_token_cache
+from src.utils.user_cache import user_status_cache
+from src.core.tracing import trace_calls
 from .abstracts import AsyncUsersService
 
-logging.config.fileConfig('./src/core/logging.conf', disable_existing_loggers=False)
 logger = logging.getLogger(__name__)
 
 
+@trace_calls('users')
 class UserService(AsyncUsersService):
-    def __init__(self, db_service: DbService) -> None:
+    def __init__(
+        self,
+        db_service: DbService,
+        redis_service: RedisService
+    ) -> None:
         self.db_service = db_service
+        self.redis_service = redis_service
+
+    @staticmethod
+    def encode_cursor(created_at: datetime, row_id: uuid.UUID) -> str:
+        raw = f'{created_at.isoformat()}|{row_id}'.encode('utf-8')
+        return base64.urlsafe_b64encode(raw).decode('ascii')
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> Tuple[datetime, uuid.UUID]:
+        raw = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8')
+        created_at, row_id = raw.split('|')
+        return datetime.fromisoformat(created_at), uuid.UUID(row_id)
 
     async def get_account_history(
         self,
-        user_id: uuid
-    ) -> Optional[List[ShemaAccountHistory]]:
+        user_id: uuid,
+        page_size: int,
+        cursor: Optional[str] = None,
+        page: Optional[int] = None,
+    ) -> Optional[Tuple[List[ShemaAccountHistory], Optional[str]]]:
         try:
-            logger.info(f"""Start to get account history. Params:
-            user_id - {user_id}""")
-            account_history = await self.db_service.simple_select(
-                what_select=AccountHistory,
-                where_select=[AccountHistory.user_id, user_id],
-                order_select=AccountHistory.created_at.desc
+            logger.info(
+                "Start to get account history. Params: user_id - %s, cursor - %s, page - %s",
+                user_id, cursor, page
             )
+            after = None
+            if cursor:
+                try:
+                    after = self.decode_cursor(cursor)
+                except ValueError:
+                    return HTTPStatus.BAD_REQUEST
+
+            # лишняя запись показывает, что есть следующая страница
+            rows = await self.db_service.get_account_history(
+                user_id=user_id,
+                limit=page_size + 1,
+                after=after,
+                offset=(page - 1) * page_size if page else None
+            )
+            next_cursor = None
+            if len(rows) > page_size:
+                rows = rows[:page_size]
+                next_cursor = self.encode_cursor(
+                    rows[-1].created_at, rows[-1].id
+                )
             logger.info("Finish to get account history")
             return [
                 ShemaAccountHistory(
                     user_agent=login.user_agent,
                     created_at=login.created_at
                 )
-                for login in account_history
-            ]
+                for login in rows
+            ], next_cursor
         except Exception as err:
-            logger.error(f"Couldn't to get account history, Err - {err}")
+            logger.error("Couldn't to get account history, Err - %s", err)
             return None
 
     async def change_password(
@@ -61,22 +104,25 @@ class UserService(AsyncUsersService):
             )
             user = user[0]
 
-            password_match = check_password_hash(
-                pwhash=user.hash_password,
-                password=settings.SAULT + user.email + current_password
+            password_match = await password_hashing.verify(
+                user.hash_password,
+                settings.SAULT + user.email + current_password
             )
 
             if not password_match:
                 return HTTPStatus.UNAUTHORIZED
 
-            user.hash_password = generate_password_hash(
-                password=settings.SAULT + user.email + password
+            user.hash_password = await password_hashing.hash(
+                settings.SAULT + user.email + password
             )
             await self.db_service.db.commit()
             logger.info("End to change password")
             return Status(status='success')
+        except HashingPoolBusy:
+            logger.warning("Couldn't to change password. Hashing pool is busy")
+            return HTTPStatus.SERVICE_UNAVAILABLE
         except Exception as err:
-            logger.error(f"Couldn't to change password, Err - {err}")
+            logger.error("Couldn't to change password, Err - %s", err)
             return None
         # add condition when user want to out of all his gadgets.
 
@@ -102,29 +148,37 @@ class UserService(AsyncUsersService):
             )
             user = user[0]
 
-            password_match = check_password_hash(
-                pwhash=user.hash_password,
-                password=settings.SAULT + user_info.email + current_password
+            password_match = await password_hashing.verify(
+                user.hash_password,
+                settings.SAULT + user_info.email + current_password
             )
             if not password_match:
                 return HTTPStatus.UNAUTHORIZED
 
             user.email = new_email
-            user.hash_password = generate_password_hash(
-                password=settings.SAULT + new_email + current_password
+            user.hash_password = await password_hashing.hash(
+                settings.SAULT + new_email + current_password
             )
             await self.db_service.db.commit()
+            # токены со старым email должны перестать проходить сразу
+            await user_status_cache.invalidate(self.redis_service, user.id)
+            access_token_cache.invalidate_user(user.id)
             logger.info("Finish to change email")
             return Status(status='success')
+        except HashingPoolBusy:
+            logger.warning("Couldn't to change email. Hashing pool is busy")
+            return HTTPStatus.SERVICE_UNAVAILABLE
         except Exception as err:
-            logger.error(f"Couldn't to change email. Err - {err}")
+            logger.error("Couldn't to change email. Err - %s", err)
             return None
 
 
 @lru_cache()
 def user_service(
     db: AsyncSession = Depends(get_session),
+    redis: Redis = Depends(get_redis),
 ) -> UserService:
     return UserService(
-        db_service=DbService(db=db)
+        db_service=DbService(db=db),
+        redis_service=RedisService(redis=redis)
     )
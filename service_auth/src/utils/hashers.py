@@ -0,0 +1,159 @@
+import abc
+
+from typing import Dict, Optional, Tuple
+
+from werkzeug.security import (
+    DEFAULT_PBKDF2_ITERATIONS, check_password_hash, generate_password_hash
+)
+
+from src.core.config import settings
+
+try:
+    from passlib import hash as passlib_hash
+except ImportError:
+    passlib_hash = None
+
+
+class PasswordHasher(abc.ABC):
+    name: str
+
+    @abc.abstractmethod
+    def identify(self, pwhash: str) -> bool:
+        pass
+
+    @abc.abstractmethod
+    def hash(self, password: str) -> str:
+        pass
+
+    @abc.abstractmethod
+    def verify(self, pwhash: str, password: str) -> bool:
+        pass
+
+    @abc.abstractmethod
+    def needs_update(self, pwhash: str) -> bool:
+        pass
+
+
+class Pbkdf2Hasher(PasswordHasher):
+    """Формат werkzeug: pbkdf2:sha256:<iterations>$<salt>$<hash>."""
+
+    name = 'pbkdf2'
+
+    def __init__(self, cost: Optional[int] = None) -> None:
+        self.iterations = cost or DEFAULT_PBKDF2_ITERATIONS
+        self.method = f'pbkdf2:sha256:{self.iterations}'
+
+    @staticmethod
+    def _iterations(pwhash: str) -> int:
+        method = pwhash.split('$', 1)[0].split(':')
+        return int(method[2]) if len(method) > 2 else 0
+
+    def identify(self, pwhash: str) -> bool:
+        return pwhash.startswith('pbkdf2:')
+
+    def hash(self, password: str) -> str:
+        return generate_password_hash(password, method=self.method)
+
+    def verify(self, pwhash: str, password: str) -> bool:
+        return check_password_hash(pwhash, password)
+
+    def needs_update(self, pwhash: str) -> bool:
+        return self._iterations(pwhash) < self.iterations
+
+
+class PasslibHasher(PasswordHasher):
+    """Обёртка над схемой passlib, cost передаётся в её параметр rounds."""
+
+    def __init__(
+        self,
+        name: str,
+        scheme: str,
+        cost_param: str,
+        cost: Optional[int] = None
+    ) -> None:
+        self.name = name
+        handler = getattr(passlib_hash, scheme)
+        self.handler = handler.using(**{cost_param: cost}) if cost else handler
+
+    def identify(self, pwhash: str) -> bool:
+        return self.handler.identify(pwhash)
+
+    def hash(self, password: str) -> str:
+        return self.handler.hash(password)
+
+    def verify(self, pwhash: str, password: str) -> bool:
+        return self.handler.verify(password, pwhash)
+
+    def needs_update(self, pwhash: str) -> bool:
+        return self.handler.needs_update(pwhash)
+
+
+# bcrypt обрезает пароль до 72 байт, а у нас к паролю приклеены соль и
+# email, поэтому берём bcrypt_sha256, который сначала считает sha256.
+PASSLIB_SCHEMES = {
+    'bcrypt': ('bcrypt_sha256', 'rounds'),
+    'argon2': ('argon2', 'rounds'),
+    'scrypt': ('scrypt', 'rounds'),
+}
+
+
+def available_hashers() -> Tuple[str, ...]:
+    names = ['pbkdf2']
+    if passlib_hash is not None:
+        for name, (scheme, _) in PASSLIB_SCHEMES.items():
+            handler = getattr(passlib_hash, scheme)
+            if not hasattr(handler, 'has_backend') or handler.has_backend():
+                names.append(name)
+    return tuple(names)
+
+
+def make_hasher(name: str, cost: Optional[int] = None) -> PasswordHasher:
+    if name == 'pbkdf2':
+        return Pbkdf2Hasher(cost=cost)
+    if name not in PASSLIB_SCHEMES:
+        raise ValueError(f'Unknown password hasher: {name}')
+    if name not in available_hashers():
+        raise ValueError(f'Password hasher {name} is not installed')
+    scheme, cost_param = PASSLIB_SCHEMES[name]
+    return PasslibHasher(name, scheme, cost_param, cost=cost)
+
+
+_hashers: Dict[str, PasswordHasher] = {}
+
+
+def get_hasher(name: str = None) -> PasswordHasher:
+    name = name or settings.PASSWORD_HASHER
+    if name not in _hashers:
+        cost = settings.PASSWORD_HASHER_COST
+        if name != settings.PASSWORD_HASHER:
+            cost = None
+        _hashers[name] = make_hasher(name, cost=cost)
+    return _hashers[name]
+
+
+def identify_hasher(pwhash: str) -> Optional[PasswordHasher]:
+    for name in available_hashers():
+        hasher = get_hasher(name)
+        if hasher.identify(pwhash):
+            return hasher
+    return None
+
+
+def hash_password(password: str) -> str:
+    return get_hasher().hash(password)
+
+
+def verify_password(pwhash: str, password: str) -> bool:
+    hasher = identify_hasher(pwhash)
+    return hasher is not None and hasher.verify(pwhash, password)
+
+
+def verify_and_update(pwhash: str, password: str) -> Tuple[bool, Optional[str]]:
+    """Проверяет пароль и, если хэш устарел, возвращает новый хэш."""
+    hasher = identify_hasher(pwhash)
+    if hasher is None or not hasher.verify(pwhash, password):
+        return False, None
+    default = get_hasher()
+    if hasher is not default or default.needs_update(pwhash):
+        return True, default.hash(password)
+    return True, None
@@ -0,0 +1,101 @@
+import asyncio
+import time
+
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Optional
+
+from src.core.config import settings
+from src.core.metrics import HASHING_POOL_RESULTS, HASHING_POOL_WAIT
+from src.core.tracing import trace_calls
+from src.utils.hashers import hash_password, verify_and_update, verify_password
+
+
+COMPLETED = HASHING_POOL_RESULTS.labels(result='completed')
+REJECTED = HASHING_POOL_RESULTS.labels(result='rejected')
+
+
+class HashingPoolBusy(Exception):
+    pass
+
+
+def _timed_call(func, submitted_at: float, *args):
+    # Вызывается внутри пула, поэтому время ожидания считаем там же
+    return time.time() - submitted_at, func(*args)
+
+
+@trace_calls('hashing')
+class PasswordHashingPool:
+    """Выполняет хэширование паролей вне event loop.
+
+    Очередь ограничена: если заданий больше, чем воркеров плюс
+    max_queue, новое задание сразу отклоняется с HashingPoolBusy.
+    """
+
+    def __init__(self, kind: str, max_workers: int, max_queue: int) -> None:
+        self.kind = kind
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.pending = 0
+        self._executor: Optional[Executor] = None
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            if self.kind == 'process':
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers
+                )
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix='password-hashing',
+                )
+        return self._executor
+
+    async def _run(self, func, *args):
+        if self.pending >= self.max_workers + self.max_queue:
+            REJECTED.inc()
+            raise HashingPoolBusy('Password hashing pool is saturated')
+
+        self.pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            wait_time, result = await loop.run_in_executor(
+                self.executor, partial(_timed_call, func, time.time(), *args)
+            )
+        finally:
+            self.pending -= 1
+        COMPLETED.inc()
+        HASHING_POOL_WAIT.observe(wait_time)
+        return result
+
+    async def hash(self, password: str) -> str:
+        return await self._run(hash_password, password)
+
+    async def verify(self, pwhash: str, password: str) -> bool:
+        return await self._run(verify_password, pwhash, password)
+
+    async def verify_and_update(self, pwhash: str, password: str):
+        return await self._run(verify_and_update, pwhash, password)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def stats(self) -> dict:
+        return {
+            'kind': self.kind,
+            'max_workers': self.max_workers,
+            'max_queue': self.max_queue,
+            'pending': self.pending,
+            'queue_depth': max(0, self.pending - self.max_workers),
+        }
+
+
+password_hashing = PasswordHashingPool(
+    kind=settings.PASSWORD_HASHING_EXECUTOR,
+    max_workers=settings.PASSWORD_HASHING_WORKERS,
+    max_queue=settings.PASSWORD_HASHING_QUEUE_SIZE,
+)
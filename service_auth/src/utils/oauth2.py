@@ -1,5 +1,3 @@
-import json
-
 from fastapi import Depends, HTTPException, status, Security
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from redis.asyncio import Redis
@@ -7,65 +5,85 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.sql import select
 
 from src.db.postgres import get_session
-from src.db.db_redis import get_redis
-from src.core.oauth2 import AuthJWT
+from src.db.db_redis import get_redis, RedisService
+from src.core.oauth2 import TokenError, TokenTypeError, decode_token
+from src.core.tracing import traced
 from src.schemas.entity import UserInDB
 from src.models.entity import User
+from src.utils.token_cache import access_token_cache
+from src.utils.user_cache import user_status_cache
 
 
+@traced('oauth2.get_current_user')
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Security(HTTPBearer()),
     redis: Redis = Depends(get_redis),
     db: AsyncSession = Depends(get_session),
-    Authorize: AuthJWT = Depends(),
 ) -> UserInDB:
 
     token = credentials.credentials
 
+    cached_user = access_token_cache.get(token)
+    if cached_user is not None:
+        return cached_user
+
     # проверка токена
     try:
-        await Authorize._verifying_token(token)
-    except Exception:
+        data_token = decode_token(token, token_type='access')
+    except TokenTypeError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Access token is expired",
+            detail="Invalid authentication credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
-
-    data_token = await Authorize.get_raw_jwt(token)
-    if token and data_token['type'] != 'access':
+    except TokenError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid authentication credentials",
+            detail="Access token is expired",
             headers={"WWW-Authenticate": "Bearer"},
         )
     # нужно проверить в redis наличие токена по юзеру
-    user_tokens = json.loads(await redis.get(data_token.get('sub')))
-    if token not in user_tokens.values():
+    redis_service = RedisService(redis=redis)
+    if not await redis_service.has_token(data_token.get('sub'), token):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid authentication credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    # проверить usera в бд
-    existing_user = await db.execute(
-        select(User).where(User.email == data_token.get('email'))
+    # проверить usera: сначала кэш в redis, в бд только при промахе
+    async def load_user_status():
+        existing_user = await db.execute(
+            select(User.email, User.is_active)
+            .where(User.id == data_token.get('sub'))
+        )
+        existing_user = existing_user.first()
+        if not existing_user:
+            return None
+        return {
+            'email': existing_user.email,
+            'is_active': existing_user.is_active
+        }
+
+    user_status = await user_status_cache.get(
+        redis_service, data_token.get('sub'), loader=load_user_status
     )
-    existing_user = existing_user.scalar()
-    if not existing_user:
+    # токен, выданный до смены email, больше не действует
+    if not user_status or user_status['email'] != data_token.get('email'):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid authentication credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    if not existing_user.is_active:
+    if not user_status['is_active']:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="Inactive user"
         )
-    return UserInDB(
+    user = UserInDB(
         id=data_token.get('sub'),
         email=data_token.get('email'),
         role_id=data_token.get('role_id')
     )
+    access_token_cache.set(token, user, exp=data_token.get('exp', 0))
+    return user
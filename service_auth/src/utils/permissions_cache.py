@@ -0,0 +1,93 @@
+import json
+import time
+
+from datetime import timedelta
+from typing import Awaitable, Callable, Iterable, Optional
+
+from src.core.config import settings
+from src.core.metrics import CACHE_LOOKUPS
+from src.db.db_redis import RedisService
+
+PERMISSIONS_MAP_KEY = 'permissions_map'
+
+LOCAL_HITS = CACHE_LOOKUPS.labels(cache='permissions', result='local_hit')
+REDIS_HITS = CACHE_LOOKUPS.labels(cache='permissions', result='redis_hit')
+MISSES = CACHE_LOOKUPS.labels(cache='permissions', result='miss')
+
+
+class PermissionsCache:
+    """Карта прав: номер бита каждого права и маска каждой роли.
+
+    Карта целиком лежит в Redis и коротко в памяти воркера, маска
+    пользователя собирается из масок его ролей и запоминается
+    для набора ролей до следующей перезагрузки карты.
+    """
+
+    def __init__(self, local_ttl: int, redis_ttl: int) -> None:
+        self.local_ttl = local_ttl
+        self.redis_ttl = redis_ttl
+        self._map: Optional[dict] = None
+        self._expires_at = 0.0
+        self._masks: dict = {}
+
+    def _set_local(self, permissions_map: dict) -> None:
+        self._map = permissions_map
+        self._expires_at = time.monotonic() + self.local_ttl
+        self._masks = {}
+
+    async def get_map(
+        self,
+        redis_service: RedisService,
+        loader: Callable[[], Awaitable[dict]]
+    ) -> dict:
+        if self._map is not None and self._expires_at > time.monotonic():
+            LOCAL_HITS.inc()
+            return self._map
+
+        permissions_map = await redis_service.get(PERMISSIONS_MAP_KEY)
+        if permissions_map is not None:
+            REDIS_HITS.inc()
+        else:
+            MISSES.inc()
+            permissions_map = await loader()
+            await redis_service.set(
+                name=PERMISSIONS_MAP_KEY,
+                value=json.dumps(permissions_map),
+                ex=timedelta(seconds=self.redis_ttl)
+            )
+        self._set_local(permissions_map)
+        return permissions_map
+
+    def user_mask(self, permissions_map: dict, roles: Iterable[str]) -> int:
+        key = frozenset(roles)
+        mask = self._masks.get(key) if permissions_map is self._map else None
+        if mask is None:
+            mask = 0
+            for role in key:
+                mask |= permissions_map['roles'].get(role, 0)
+            if permissions_map is self._map:
+                self._masks[key] = mask
+        return mask
+
+    @staticmethod
+    def has_permission(
+        permissions_map: dict,
+        mask: int,
+        permission: str
+    ) -> Optional[bool]:
+        # None - такого права нет
+        bit = permissions_map['permissions'].get(permission)
+        if bit is None:
+            return None
+        return bool(mask >> bit & 1)
+
+    async def invalidate(self, redis_service: RedisService) -> None:
+        self._map = None
+        self._masks = {}
+        await redis_service.delete_keys(PERMISSIONS_MAP_KEY)
+
+
+permissions_cache = PermissionsCache(
+    local_ttl=settings.PERMISSIONS_LOCAL_CACHE_TTL,
+    redis_ttl=settings.PERMISSIONS_CACHE_TTL,
+)
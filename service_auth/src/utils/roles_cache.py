@@ -0,0 +1,101 @@
+import json
+import time
+
+from collections import OrderedDict
+from datetime import timedelta
+from typing import Awaitable, Callable, List, Optional
+
+from src.core.config import settings
+from src.core.metrics import CACHE_LOOKUPS
+from src.db.db_redis import RedisService
+
+LOCAL_HITS = CACHE_LOOKUPS.labels(cache='user_roles', result='local_hit')
+REDIS_HITS = CACHE_LOOKUPS.labels(cache='user_roles', result='redis_hit')
+MISSES = CACHE_LOOKUPS.labels(cache='user_roles', result='miss')
+
+
+def user_roles_key(user_id: str) -> str:
+    return f'user_roles:{user_id}'
+
+
+class UserRolesCache:
+    """Кэш ролей пользователя: короткий слой в памяти воркера и Redis.
+
+    Изменения ролей в RolesService сбрасывают записи в обоих слоях,
+    в памяти других воркеров старое значение живёт не дольше local_ttl.
+    """
+
+    def __init__(self, local_ttl: int, redis_ttl: int, max_size: int) -> None:
+        self.local_ttl = local_ttl
+        self.redis_ttl = redis_ttl
+        self.max_size = max_size
+        self._local: OrderedDict = OrderedDict()
+
+    def _get_local(self, user_id: str) -> Optional[List[str]]:
+        item = self._local.get(user_id)
+        if item is None:
+            return None
+        expires_at, roles = item
+        if expires_at <= time.monotonic():
+            del self._local[user_id]
+            return None
+        self._local.move_to_end(user_id)
+        return roles
+
+    def _set_local(self, user_id: str, roles: List[str]) -> None:
+        if self.max_size <= 0 or self.local_ttl <= 0:
+            return
+        self._local[user_id] = (time.monotonic() + self.local_ttl, roles)
+        self._local.move_to_end(user_id)
+        while len(self._local) > self.max_size:
+            self._local.popitem(last=False)
+
+    async def get(
+        self,
+        redis_service: RedisService,
+        user_id: str,
+        loader: Callable[[], Awaitable[List[str]]]
+    ) -> List[str]:
+        user_id = str(user_id)
+        roles = self._get_local(user_id)
+        if roles is not None:
+            LOCAL_HITS.inc()
+            return roles
+
+        roles = await redis_service.get(user_roles_key(user_id))
+        if roles is not None:
+            REDIS_HITS.inc()
+        else:
+            MISSES.inc()
+            roles = list(await loader())
+            await self.set(redis_service, user_id, roles)
+        self._set_local(user_id, roles)
+        return roles
+
+    async def set(
+        self,
+        redis_service: RedisService,
+        user_id: str,
+        roles: List[str]
+    ) -> None:
+        await redis_service.set(
+            name=user_roles_key(user_id),
+            value=json.dumps(roles),
+            ex=timedelta(seconds=self.redis_ttl)
+        )
+        self._set_local(str(user_id), roles)
+
+    async def invalidate(self, redis_service: RedisService, *user_ids) -> None:
+        user_ids = [str(user_id) for user_id in user_ids]
+        for user_id in user_ids:
+            self._local.pop(user_id, None)
+        await redis_service.delete_keys(
+            *[user_roles_key(user_id) for user_id in user_ids]
+        )
+
+
+user_roles_cache = UserRolesCache(
+    local_ttl=settings.ROLES_LOCAL_CACHE_TTL,
+    redis_ttl=settings.ROLES_CACHE_TTL,
+    max_size=settings.ROLES_LOCAL_CACHE_SIZE,
+)
@@ -0,0 +1,84 @@
+import hashlib
+import time
+
+from collections import OrderedDict
+from typing import Dict, Optional, Set
+
+from src.core.config import settings
+from src.core.metrics import CACHE_LOOKUPS
+from src.schemas.entity import UserInDB
+
+HITS = CACHE_LOOKUPS.labels(cache='access_token', result='hit')
+MISSES = CACHE_LOOKUPS.labels(cache='access_token', result='miss')
+
+
+class AccessTokenCache:
+    """LRU-кэш проверенных access токенов в памяти воркера.
+
+    Запись живёт до exp токена, но не дольше max_ttl секунд, поэтому
+    выход с другого воркера виден не позже чем через max_ttl.
+    """
+
+    def __init__(self, max_size: int, max_ttl: int) -> None:
+        self.max_size = max_size
+        self.max_ttl = max_ttl
+        self._data: OrderedDict = OrderedDict()
+        self._by_user: Dict[str, Set[str]] = {}
+
+    @staticmethod
+    def digest(token: str) -> str:
+        return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+    def get(self, token: str) -> Optional[UserInDB]:
+        key = self.digest(token)
+        item = self._data.get(key)
+        if item is None:
+            MISSES.inc()
+            return None
+        expires_at, user = item
+        if expires_at <= time.monotonic():
+            self._remove(key)
+            MISSES.inc()
+            return None
+        self._data.move_to_end(key)
+        HITS.inc()
+        return user
+
+    def set(self, token: str, user: UserInDB, exp: int) -> None:
+        if self.max_size <= 0 or self.max_ttl <= 0:
+            return
+        ttl = min(self.max_ttl, exp - time.time())
+        if ttl <= 0:
+            return
+        key = self.digest(token)
+        self._data[key] = (time.monotonic() + ttl, user)
+        self._data.move_to_end(key)
+        self._by_user.setdefault(str(user.id), set()).add(key)
+        while len(self._data) > self.max_size:
+            oldest = next(iter(self._data))
+            self._remove(oldest)
+
+    def invalidate_user(self, user_id: str) -> None:
+        for key in self._by_user.pop(str(user_id), set()):
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+        self._by_user.clear()
+
+    def _remove(self, key: str) -> None:
+        item = self._data.pop(key, None)
+        if item is None:
+            return
+        user_id = str(item[1].id)
+        keys = self._by_user.get(user_id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_user[user_id]
+
+
+access_token_cache = AccessTokenCache(
+    max_size=settings.ACCESS_TOKEN_CACHE_SIZE,
+    max_ttl=settings.ACCESS_TOKEN_CACHE_TTL,
+)
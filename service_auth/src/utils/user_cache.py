@@ -0,0 +1,55 @@
+import json
+
+from datetime import timedelta
+from typing import Awaitable, Callable, Optional
+
+from src.core.config import settings
+from src.core.metrics import CACHE_LOOKUPS
+from src.db.db_redis import RedisService
+
+HITS = CACHE_LOOKUPS.labels(cache='user_status', result='hit')
+MISSES = CACHE_LOOKUPS.labels(cache='user_status', result='miss')
+
+
+def user_status_key(user_id: str) -> str:
+    return f'user_status:{user_id}'
+
+
+class UserStatusCache:
+    """Кэш email и is_active пользователя в Redis по его id.
+
+    Сбрасывается при смене email, деактивации и удалении пользователя.
+    Несуществующие пользователи не кэшируются.
+    """
+
+    def __init__(self, ttl: int) -> None:
+        self.ttl = ttl
+
+    async def get(
+        self,
+        redis_service: RedisService,
+        user_id: str,
+        loader: Callable[[], Awaitable[Optional[dict]]]
+    ) -> Optional[dict]:
+        status = await redis_service.get(user_status_key(user_id))
+        if status is not None:
+            HITS.inc()
+            return status
+
+        MISSES.inc()
+        status = await loader()
+        if status is not None:
+            await redis_service.set(
+                name=user_status_key(user_id),
+                value=json.dumps(status),
+                ex=timedelta(seconds=self.ttl)
+            )
+        return status
+
+    async def invalidate(self, redis_service: RedisService, *user_ids) -> None:
+        await redis_service.delete_keys(
+            *[user_status_key(user_id) for user_id in user_ids]
+        )
+
+
+user_status_cache = UserStatusCache(ttl=settings.USER_STATUS_CACHE_TTL)
@@ -13,6 +13,7 @@ class TestSettings(BaseSettings):
     app_host: str = os.getenv("APP_HOST", "127.0.0.1")
     app_port: int = int(os.getenv("APP_PORT", 8000))
     app_api_host: str = f'http://auth_service:{app_port}/api/v1/'
+    app_metrics_url: str = f'http://auth_service:{app_port}/metrics'
 
     # Настройки Redis
     redis_host: str = os.getenv("REDIS_HOST", "127.0.0.1")
@@ -27,6 +28,9 @@ class TestSettings(BaseSettings):
     db_port: int = int(os.getenv("POSTGRES_PORT", 5432))
     dsl_database: str = f"postgresql+asyncpg://{db_user}:{db_password}@{db_host}:{db_port}/{db_name}?async_fallback=True"
 
+    # Сколько ждать, пока буфер истории входов запишет строки в базу
+    history_flush_timeout: float = float(os.getenv("HISTORY_FLUSH_TIMEOUT", 10))
+
     # Корень проекта
     base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
@@ -9,6 +9,7 @@ from ..testdata.auth import (
     REGISTER_NEGATIVE_DATA,
     LOGIN_POSITIVE_DATA,
     LOGIN_NEGATIVE_DATA,
+    LOGIN_STATEMENTS_DATA,
     REFRESH_POSITIVE_DATA,
     REFRESH_NEGATIVE_DATA,
     LOGOUTME_POSITIVE_DATA,
@@ -114,6 +115,37 @@ async def test_negative_login(
         assert data_response.get('detail') == expected_answer.get('msg')
 
 
+@pytest.mark.parametrize(
+    'query_data, expected_answer',
+    LOGIN_STATEMENTS_DATA
+)
+@pytest.mark.anyio
+async def test_login_statements(
+    make_post_request: Coroutine,
+    make_get_request_with_session: Coroutine,
+    query_data: Dict[str, Union[str, int, float, None]],
+    expected_answer: Dict[str, Union[str, int, float, None]],
+):
+
+    async def db_statements() -> float:
+        # счётчик суммируется по всем воркерам, см. src/core/metrics.py
+        response = await make_get_request_with_session(sett.app_metrics_url, params={})
+        for line in (await response.text()).splitlines():
+            if line.startswith('db_statements_total '):
+                return float(line.split()[1])
+
+    before = await db_statements()
+
+    url = f'{sett.app_api_host}auth/login'
+    response = await make_post_request(url, params=query_data)
+
+    after = await db_statements()
+
+    # check tests
+    assert response.status == expected_answer.get('status')
+    assert after - before <= expected_answer.get('max_statements')
+
+
 @pytest.mark.parametrize(
     'query_data, expected_answer',
     REFRESH_POSITIVE_DATA
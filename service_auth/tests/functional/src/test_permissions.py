@@ -0,0 +1,99 @@
+import pytest
+
+from typing import Coroutine, Dict, Union
+
+from ..settings import test_settings as sett
+from ..testdata.permissions import (
+    CHECK_PERMISSION_DATA,
+    BATCH_CHECK_PERMISSION_DATA
+)
+
+
+@pytest.mark.parametrize(
+    'query_data, expected_answer',
+    CHECK_PERMISSION_DATA
+)
+@pytest.mark.anyio
+async def test_check_permission(
+    make_post_request: Coroutine,
+    make_post_request_with_session: Coroutine,
+    make_get_request_with_session: Coroutine,
+    query_data: Dict[str, Union[str, int, float, None]],
+    expected_answer: Dict[str, Union[str, int, float, None]],
+):
+
+    url = f'{sett.app_api_host}auth/login'
+    response = await make_post_request(url, params=query_data)
+    data_response = await response.json()
+    headers = {
+        'Authorization': f'Bearer {data_response.get("access_token")}'
+    }
+
+    url = f'{sett.app_api_host}permissions'
+    await make_post_request_with_session(
+        url,
+        json={
+            'name': query_data.get('name'),
+            'description': query_data.get('description')
+        },
+        headers=headers
+    )
+    url = f'{sett.app_api_host}permissions/role'
+    await make_post_request_with_session(
+        url,
+        params={
+            'role_name': query_data.get('role_name'),
+            'permission_name': query_data.get('name')
+        },
+        headers=headers
+    )
+
+    url = f'{sett.app_api_host}permissions/check'
+    response = await make_get_request_with_session(
+        url,
+        params={'permission': query_data.get('name')},
+        headers=headers
+    )
+    data_response = await response.json()
+
+    # check tests
+    assert response.status == expected_answer.get('status')
+    assert data_response.get('allowed') == expected_answer.get('allowed')
+
+    response = await make_get_request_with_session(
+        url,
+        params={'permission': 'unknown_permission'},
+        headers=headers
+    )
+    assert response.status == expected_answer.get('unknown_status')
+
+
+@pytest.mark.parametrize(
+    'query_data, expected_answer',
+    BATCH_CHECK_PERMISSION_DATA
+)
+@pytest.mark.anyio
+async def test_batch_check_permission(
+    make_post_request: Coroutine,
+    make_post_request_with_session: Coroutine,
+    query_data: Dict[str, Union[str, int, float, None]],
+    expected_answer: Dict[str, Union[str, int, float, None]],
+):
+
+    url = f'{sett.app_api_host}auth/login'
+    response = await make_post_request(url, params=query_data)
+    data_response = await response.json()
+
+    url = f'{sett.app_api_host}permissions/check'
+    response = await make_post_request_with_session(
+        url,
+        json={'labels': query_data.get('labels')},
+        headers={
+            'Authorization': f'Bearer {data_response.get("access_token")}'
+        }
+    )
+    data_response = await response.json()
+
+    # check tests
+    assert response.status == expected_answer.get('status')
+    assert data_response.get('allowed') == expected_answer.get('allowed')
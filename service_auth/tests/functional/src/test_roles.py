@@ -15,7 +15,8 @@ from ..testdata.roles import (
     DELETEROLE_NEGATIVE_DATA,
     SET_USER_ROLE_POSITIVE_DATA,
     SET_USER_ROLE_NEGATIVE_DATA,
-    DELETE_USER_ROLE_POSITIVE_DATA
+    DELETE_USER_ROLE_POSITIVE_DATA,
+    GETROLES_ETAG_DATA
 )
 
 
@@ -403,4 +404,44 @@ async def test_positive_delete_user_role(
     # check tests
     assert response.status == expected_answer.get('status')
     assert len(data_response) == expected_answer.get('length')
-    assert data_response == expected_answer.get('full_return')
\ No newline at end of file
+    assert data_response == expected_answer.get('full_return')
+
+
+@pytest.mark.parametrize(
+    'query_data, expected_answer',
+    GETROLES_ETAG_DATA
+)
+@pytest.mark.anyio
+async def test_get_roles_etag(
+    make_post_request: Coroutine,
+    make_get_request_with_session: Coroutine,
+    query_data: Dict[str, Union[str, int, float, None]],
+    expected_answer: Dict[str, Union[str, int, float, None]],
+):
+
+    url = f'{sett.app_api_host}auth/login'
+    response = await make_post_request(url, params=query_data)
+    data_response = await response.json()
+    access_token = data_response.get("access_token")
+
+    url = f'{sett.app_api_host}roles'
+    response = await make_get_request_with_session(
+        url,
+        params={},
+        headers={'Authorization': f'Bearer {access_token}'}
+    )
+    etag = response.headers.get('ETag')
+
+    # check tests
+    assert response.status == expected_answer.get('status')
+    assert etag
+
+    response = await make_get_request_with_session(
+        url,
+        params={},
+        headers={
+            'Authorization': f'Bearer {access_token}',
+            'If-None-Match': etag
+        }
+    )
+    assert response.status == expected_answer.get('not_modified_status')
@@ -1,3 +1,4 @@
+import asyncio
 import pytest
 
 from typing import Coroutine, Dict, Union
@@ -5,6 +6,7 @@ from typing import Coroutine, Dict, Union
 from ..settings import test_settings as sett
 from ..testdata.users import (
     GETME_POSITIVE_DATA,
+    ACCOUNT_HISTORY_CURSOR_DATA,
     CHANGE_PASSWORD_POSITIVE_DATA,
     CHANGE_EMAIL_POSITIVE_DATA
 )
@@ -70,6 +72,60 @@ async def test_negative_get_account_history(
     pass
 
 
+@pytest.mark.parametrize(
+    'query_data, expected_answer',
+    ACCOUNT_HISTORY_CURSOR_DATA
+)
+@pytest.mark.anyio
+async def test_positive_get_account_history_cursor(
+    make_post_request: Coroutine,
+    make_get_request_with_session: Coroutine,
+    query_data: Dict[str, Union[str, int, float, None]],
+    expected_answer: Dict[str, Union[str, int, float, None]],
+):
+    # два входа, чтобы в истории точно была вторая страница
+    url = f'{sett.app_api_host}auth/login'
+    await make_post_request(url, params=query_data)
+    response = await make_post_request(url, params=query_data)
+    data_response = await response.json()
+    headers = {
+        'Authorization': f'Bearer {data_response.get("access_token")}'
+    }
+
+    # история пишется в базу пачками, ждём, пока обе записи дойдут
+    url = f'{sett.app_api_host}users/account-history'
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + sett.history_flush_timeout
+    while True:
+        response = await make_get_request_with_session(
+            url, params={'page_size': 2}, headers=headers
+        )
+        if len(await response.json()) >= 2 or loop.time() >= deadline:
+            break
+        await asyncio.sleep(0.2)
+
+    params = {'page_size': expected_answer.get('page_size')}
+    response = await make_get_request_with_session(
+        url, params=params, headers=headers
+    )
+    first_page = await response.json()
+    next_cursor = response.headers.get('X-Next-Cursor')
+
+    assert response.status == expected_answer.get('status')
+    assert len(first_page) == expected_answer.get('length')
+    assert next_cursor is not None
+
+    params.update({'cursor': next_cursor})
+    response = await make_get_request_with_session(
+        url, params=params, headers=headers
+    )
+    second_page = await response.json()
+
+    assert response.status == expected_answer.get('status')
+    assert len(second_page) == expected_answer.get('length')
+    assert second_page[0]['created_at'] <= first_page[0]['created_at']
+
+
 @pytest.mark.parametrize(
     'query_data, expected_answer',
     CHANGE_PASSWORD_POSITIVE_DATA
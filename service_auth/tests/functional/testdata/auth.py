@@ -164,6 +164,18 @@ LOGIN_NEGATIVE_DATA = [
     )
 ]
 
+# выборка пользователя с ролями, вставка refresh токена
+# и, если хэш пароля устарел, его обновление
+LOGIN_STATEMENTS_DATA = [
+    (
+        {
+            'email': 'testtt1234@test.com', 'password': '123QWEstring'},
+        {
+            'status': HTTPStatus.ACCEPTED, 'max_statements': 3
+        }
+    )
+]
+
 REFRESH_POSITIVE_DATA = [
     (
         {
@@ -0,0 +1,28 @@
+from http import HTTPStatus
+
+
+CHECK_PERMISSION_DATA = [
+    (
+        {
+            'email': 'testtt1234@test.com', 'password': '123QWEstring',
+            'name': 'view_films', 'description': 'view_films',
+            'role_name': 'user'
+        },
+        {
+            'status': HTTPStatus.OK, 'allowed': True,
+            'unknown_status': HTTPStatus.BAD_REQUEST
+        }
+    )
+]
+
+BATCH_CHECK_PERMISSION_DATA = [
+    (
+        {
+            'email': 'testtt1234@test.com', 'password': '123QWEstring',
+            'labels': ['view_films', 'unknown_label', 'view_films']
+        },
+        {
+            'status': HTTPStatus.OK, 'allowed': [True, False, True]
+        }
+    )
+]
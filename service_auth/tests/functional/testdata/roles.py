@@ -166,4 +166,15 @@ DELETE_USER_ROLE_POSITIVE_DATA = [
             }
         }
     )
-]
\ No newline at end of file
+]
+GETROLES_ETAG_DATA = [
+    (
+        {
+            'email': 'testtt1234@test.com', 'password': '123QWEstring'
+        },
+        {
+            'status': HTTPStatus.ACCEPTED,
+            'not_modified_status': HTTPStatus.NOT_MODIFIED
+        }
+    )
+]
@@ -14,6 +14,17 @@ GETME_POSITIVE_DATA = [
     )
 ]
 
+ACCOUNT_HISTORY_CURSOR_DATA = [
+    (
+        {
+            'email': 'testtt1234@test.com', 'password': '123QWEstring'
+        },
+        {
+            'status': HTTPStatus.ACCEPTED, 'length': 1, 'page_size': 1
+        }
+    )
+]
+
 CHANGE_PASSWORD_POSITIVE_DATA = [
     (
         {
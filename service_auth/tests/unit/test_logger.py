@@ -0,0 +1,32 @@
+import io
+import logging
+
+from uvicorn.logging import AccessFormatter
+
+from src.core.logger import QueueLogging
+
+
+def test_queued_uvicorn_access_record():
+    stream = io.StringIO()
+    errors = []
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(
+        AccessFormatter("%(client_addr)s - '%(request_line)s' %(status_code)s")
+    )
+    handler.handleError = errors.append
+
+    logger = logging.getLogger('test.uvicorn.access')
+    logger.handlers = [handler]
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+
+    queue_logging = QueueLogging('test.uvicorn.access')
+    queue_logging.start()
+    # так пишет uvicorn.protocols.http: аргументы разбирает AccessFormatter
+    logger.info(
+        '%s - "%s %s HTTP/%s" %d', '127.0.0.1:5000', 'GET', '/api/v1/roles', '1.1', 200
+    )
+    queue_logging.stop()
+
+    assert errors == []
+    assert "'GET /api/v1/roles HTTP/1.1' 200" in stream.getvalue()